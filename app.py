@@ -10,8 +10,8 @@ import os
 # Add app directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.data_loader import DataLoader
-from src.kpi_calculator import KPICalculator
+from src.data_loader import WorkbookChangedError
+from src.data_store import DataStore
 import page_modules.main_dashboard as main_dashboard
 import page_modules.sales_growth as sales_growth
 import page_modules.technician_performance as technician_performance
@@ -19,6 +19,16 @@ import page_modules.financial_metrics as financial_metrics
 import page_modules.customer_payment as customer_payment
 import page_modules.data_explorer as data_explorer
 
+# Page name -> page module
+PAGES = {
+    "🏠 Main Dashboard": main_dashboard,
+    "📈 Sales & Growth": sales_growth,
+    "🔧 Technician Performance": technician_performance,
+    "💰 Financial Metrics": financial_metrics,
+    "👥 Customer & Payment": customer_payment,
+    "📋 Data Explorer": data_explorer
+}
+
 # Page configuration
 st.set_page_config(
     page_title="FLPP Performance Dashboard",
@@ -27,14 +37,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+def get_distinct_error():
+    """Relative error for approximate distinct customer counts from FLPP_DISTINCT_ERROR (e.g. 0.02); None counts exactly"""
+    value = os.environ.get("FLPP_DISTINCT_ERROR")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        print(f"Ignoring FLPP_DISTINCT_ERROR={value!r}; counting distinct customers exactly")
+        return None
+
+
+@st.cache_resource
+def get_data_store():
+    """One data store per server process, shared by every browser session"""
+    return DataStore("data/FLPP_All_Data_Merged.xlsx", distinct_error=get_distinct_error())
+
+
+data_store = get_data_store()
+
 # Initialize session state
-if 'data_loader' not in st.session_state:
-    st.session_state.data_loader = None
-if 'kpi_calculator' not in st.session_state:
-    st.session_state.kpi_calculator = None
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 
+# Sessions only reference the shared dataset; each rerun picks up the current version
+dataset = data_store.current if st.session_state.data_loaded else None
+
 # Custom CSS for styling
 st.markdown("""
     <style>
@@ -72,15 +102,13 @@ with st.sidebar:
     st.markdown("---")
     
     # Data loading
-    if not st.session_state.data_loaded:
+    if dataset is None:
         st.info("📁 Load data to begin")
         if st.button("Load Data", type="primary"):
             with st.spinner("Loading data..."):
                 try:
-                    data_loader = DataLoader("data/FLPP_All_Data_Merged.xlsx")
-                    data_loader.load_all_data()
-                    st.session_state.data_loader = data_loader
-                    st.session_state.kpi_calculator = KPICalculator(data_loader)
+                    # Sheets are parsed lazily as pages need them
+                    data_store.load()
                     st.session_state.data_loaded = True
                     st.success("Data loaded successfully!")
                     st.rerun()
@@ -88,30 +116,23 @@ with st.sidebar:
                     st.error(f"Error loading data: {str(e)}")
     else:
         st.success("✅ Data loaded")
+        st.caption(f"Version {dataset.version} · loaded {dataset.loaded_at:%Y-%m-%d %H:%M}")
         if st.button("Reload Data"):
-            st.session_state.data_loaded = False
-            st.session_state.data_loader = None
-            st.session_state.kpi_calculator = None
-            st.rerun()
+            with st.spinner("Reloading data..."):
+                try:
+                    data_store.reload()
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error reloading data: {str(e)}")
     
     st.markdown("---")
     
     # Navigation
     st.subheader("Navigation")
-    page = st.radio(
-        "Select Page",
-        [
-            "🏠 Main Dashboard",
-            "📈 Sales & Growth",
-            "🔧 Technician Performance",
-            "💰 Financial Metrics",
-            "👥 Customer & Payment",
-            "📋 Data Explorer"
-        ]
-    )
+    page = st.radio("Select Page", list(PAGES.keys()))
 
 # Main content area
-if not st.session_state.data_loaded:
+if dataset is None:
     st.markdown('<div class="main-header">FLPP Performance Dashboard</div>', unsafe_allow_html=True)
     st.info("👈 Please load data from the sidebar to begin")
     st.markdown("""
@@ -132,19 +153,14 @@ if not st.session_state.data_loaded:
 else:
     # Route to appropriate page
     try:
-        if page == "🏠 Main Dashboard":
-            main_dashboard.render(st.session_state.kpi_calculator, st.session_state.data_loader)
-        elif page == "📈 Sales & Growth":
-            sales_growth.render(st.session_state.kpi_calculator, st.session_state.data_loader)
-        elif page == "🔧 Technician Performance":
-            technician_performance.render(st.session_state.kpi_calculator, st.session_state.data_loader)
-        elif page == "💰 Financial Metrics":
-            financial_metrics.render(st.session_state.kpi_calculator, st.session_state.data_loader)
-        elif page == "👥 Customer & Payment":
-            customer_payment.render(st.session_state.kpi_calculator, st.session_state.data_loader)
-        elif page == "📋 Data Explorer":
-            data_explorer.render(st.session_state.kpi_calculator, st.session_state.data_loader)
+        page_module = PAGES[page]
+        with st.spinner("Loading data..."):
+            dataset.data_loader.prefetch(page_module.TABLES, parallel=(os.cpu_count() or 1) > 1)
+        page_module.render(dataset)
+    except WorkbookChangedError:
+        # A sheet this page needs was never loaded and the workbook has changed since; switch to the new version
+        data_store.reload()
+        st.rerun()
     except Exception as e:
         st.error(f"Error rendering page: {str(e)}")
         st.exception(e)
-
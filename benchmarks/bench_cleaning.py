@@ -0,0 +1,68 @@
+"""
+Cleaning Benchmark
+Times the vectorized column cleaners against mapping clean_currency / clean_numeric_id over every cell
+
+Usage: python benchmarks/bench_cleaning.py [rows]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_loader import DataLoader
+
+
+def synthetic_column(rows, seed=0):
+    """Object column mixing floats, currency text, blanks and junk, like the workbook's amount columns"""
+    rng = np.random.default_rng(seed)
+    amounts = rng.uniform(0, 5000, rows).round(2)
+    kind = rng.integers(0, 10, rows)
+    values = amounts.astype(object)
+    values[kind == 1] = [f"${a:,.2f}" for a in amounts[kind == 1]]
+    values[kind == 2] = [f" {a} " for a in amounts[kind == 2]]
+    values[kind == 3] = ''
+    values[kind == 4] = None
+    values[kind == 5] = 'n/a'
+    return pd.Series(values, dtype=object)
+
+
+def currency_text_column(rows, seed=0):
+    """Column of currency text only, as when a whole amount column is formatted as text"""
+    amounts = np.random.default_rng(seed).uniform(0, 5000, rows).round(2)
+    return pd.Series([f"${a:,.2f}" for a in amounts], dtype=object)
+
+
+def timed(label, func):
+    """Run func once and print its wall time"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28}{time.perf_counter() - start:8.2f} s")
+    return result
+
+
+def main(rows=1_000_000):
+    loader = DataLoader('unused.xlsx')
+    for name, column in [('mixed', synthetic_column(rows)), ('currency text', currency_text_column(rows))]:
+        print(f"{rows:,} rows, {name}")
+        compare(loader, column)
+    print("results match")
+
+
+def compare(loader, column):
+    """Time both cleaners each way on one column and check they agree"""
+    scalar = timed("map(clean_currency)", lambda: column.map(loader.clean_currency))
+    vector = timed("clean_currency_series", lambda: loader.clean_currency_series(column))
+    assert np.array_equal(scalar.to_numpy(dtype=float), vector.to_numpy(dtype=float), equal_nan=True)
+
+    scalar = timed("map(clean_numeric_id)", lambda: column.map(loader.clean_numeric_id))
+    vector = timed("clean_numeric_id_series", lambda: loader.clean_numeric_id_series(column))
+    assert np.array_equal(scalar.astype(float).to_numpy(), vector.to_numpy(dtype=float), equal_nan=True)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,47 @@
+"""
+Monthly Means Benchmark
+Times the monthly_means bincount kernel against the two-level groupby it replaces, on synthetic rows
+
+Usage: python benchmarks/bench_monthly_means.py [rows] [entities] [months]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.kpi_cube import monthly_means
+
+
+def timed(label, func):
+    """Run func once and print its wall time"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28}{time.perf_counter() - start:8.2f} s")
+    return result
+
+
+def main(rows=10_000_000, n_entities=500, n_months=120, seed=0):
+    rng = np.random.default_rng(seed)
+    entity_codes = rng.integers(0, n_entities, rows)
+    month_codes = rng.integers(0, n_months, rows)
+    values = rng.uniform(0, 2000, rows)
+    values[rng.random(rows) < 0.01] = np.nan
+    print(f"{rows:,} rows, {n_entities} entities, {n_months} months")
+
+    df = pd.DataFrame({'entity': entity_codes, 'month': month_codes, 'value': values})
+    expected = timed("groupby sum, then mean", lambda: df.groupby(['entity', 'month'])['value'].sum().groupby(level='entity').mean())
+    means = timed("monthly_means", lambda: monthly_means(entity_codes, month_codes, values, n_entities, n_months))
+
+    observed = ~np.isnan(means)
+    assert np.array_equal(np.flatnonzero(observed), expected.index.to_numpy())
+    assert np.allclose(means[observed], expected.to_numpy(), rtol=1e-9)
+    print("results match")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -6,16 +6,21 @@ Customer satisfaction and payment metrics
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from src.ui_components import render_kpi_card, render_filters
+from src.ui_components import FILTER_TABLES, render_kpi_card, render_filters
 
+# Tables this page reads; app.py prefetches them before rendering
+TABLES = FILTER_TABLES + ['customer_reviews']
 
-def render(kpi_calculator, data_loader):
+
+def render(dataset):
     """Render the Customer & Payment page"""
+    kpi_calculator, data_loader = dataset.kpi_calculator, dataset.data_loader
     
     st.markdown('<div class="main-header">Customer & Payment Dashboard</div>', unsafe_allow_html=True)
     
     # Filters
-    filters = render_filters(data_loader, location="top")
+    filters = render_filters(dataset, location="top")
+    cards = kpi_calculator.compute_section('customer_payment', filters)
     
     st.markdown("---")
     
@@ -23,11 +28,11 @@ def render(kpi_calculator, data_loader):
     col1, col2 = st.columns(2)
     
     with col1:
-        value, target, status, pct = kpi_calculator.auto_pay_enrollment(filters)
+        value, target, status, pct = cards['auto_pay_enrollment']
         render_kpi_card("Auto Pay Enrollment", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.avg_customer_review(filters)
+        value, target, status, pct = cards['avg_customer_review']
         render_kpi_card("Avg Customer Review", value, target, status, pct, "rating")
     
     st.markdown("---")
@@ -37,9 +42,7 @@ def render(kpi_calculator, data_loader):
     
     if not customer_df.empty and 'Auto Pay Flag' in customer_df.columns:
         # Apply filters
-        filtered_customers = customer_df.copy()
-        if filters.get('branch') and 'Branch' in filtered_customers.columns:
-            filtered_customers = filtered_customers[filtered_customers['Branch'] == filters['branch']]
+        filtered_customers = kpi_calculator.filter_engine.filter('customer_detail', filters, ['branch'])
         
         col1, col2 = st.columns(2)
         
@@ -66,12 +69,9 @@ def render(kpi_calculator, data_loader):
             st.subheader("Customer Review Trend")
             reviews_df = data_loader.get_data('customer_reviews')
             
-            if not reviews_df.empty and 'Review Date' in reviews_df.columns and 'Overall Star Rating' in reviews_df.columns:
-                # Apply filters
-                filtered_reviews = reviews_df.copy()
-                
-                filtered_reviews['Year Month'] = pd.to_datetime(filtered_reviews['Review Date']).dt.to_period('M')
-                monthly_avg = filtered_reviews.groupby('Year Month')['Overall Star Rating'].mean().reset_index()
+            if not reviews_df.empty and 'Review Year Month' in reviews_df.columns and 'Overall Star Rating' in reviews_df.columns:
+                monthly_avg = reviews_df.groupby('Review Year Month')['Overall Star Rating'].mean().reset_index()
+                monthly_avg = monthly_avg.rename(columns={'Review Year Month': 'Year Month'})
                 monthly_avg['Year Month'] = monthly_avg['Year Month'].astype(str)
                 
                 fig = px.bar(
@@ -90,8 +90,7 @@ def render(kpi_calculator, data_loader):
     reviews_df = data_loader.get_data('customer_reviews')
     
     if not reviews_df.empty:
-        # Apply filters
-        filtered_reviews = reviews_df.copy()
+        filtered_reviews = reviews_df
         
         display_cols = ['Customer', 'Review Date', 'Overall Star Rating', 'Technician Star Rating', 
                        'Comments', 'Service Category', 'Technician']
@@ -101,9 +100,9 @@ def render(kpi_calculator, data_loader):
         search_term = st.text_input("Search reviews", "")
         if search_term:
             if 'Comments' in filtered_reviews.columns:
-                filtered_reviews = filtered_reviews[
-                    filtered_reviews['Comments'].astype(str).str.contains(search_term, case=False, na=False)
-                ]
+                matches = dataset.search_index.search('customer_reviews', search_term, ['Comments'])
+                if matches is not None:
+                    filtered_reviews = filtered_reviews.take(matches)
         
         st.dataframe(filtered_reviews[available_cols].head(100), use_container_width=True)
         
@@ -5,11 +5,19 @@ Detailed data tables with filtering and export
 
 import streamlit as st
 import pandas as pd
-from src.ui_components import render_filters
+import numpy as np
+from src.ui_components import FILTER_TABLES, render_filters
 
+# Tables this page always reads; the selected table is loaded on demand
+TABLES = FILTER_TABLES
 
-def render(kpi_calculator, data_loader):
+# Rows per page of the data table
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+
+def render(dataset):
     """Render the Data Explorer page"""
+    kpi_calculator, data_loader = dataset.kpi_calculator, dataset.data_loader
     
     st.markdown('<div class="main-header">Data Explorer</div>', unsafe_allow_html=True)
     
@@ -39,21 +47,10 @@ def render(kpi_calculator, data_loader):
     st.subheader(f"{selected_table} Data")
     
     # Filters
-    filters = render_filters(data_loader, location="sidebar")
+    filters = render_filters(dataset, location="sidebar")
     
     # Apply filters
-    filtered_df = df.copy()
-    if filters.get('branch') and 'Branch' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['Branch'] == filters['branch']]
-    if filters.get('sales_rep'):
-        if 'Primary Sales Rep' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Primary Sales Rep'] == filters['sales_rep']]
-        elif 'Sales Rep' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Sales Rep'] == filters['sales_rep']]
-    if filters.get('technician') and 'Tech Name' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['Tech Name'] == filters['technician']]
-    if filters.get('category') and 'Category' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['Category'] == filters['category']]
+    rows = kpi_calculator.filter_engine.row_indexer(table_name, filters, ['branch', 'sales_rep', 'technician', 'category', 'date_range'])
     
     # Search functionality
     search_cols = st.columns(3)
@@ -61,28 +58,55 @@ def render(kpi_calculator, data_loader):
         search_term = st.text_input("Search in data", "")
     
     if search_term:
-        # Search across all text columns
-        text_cols = filtered_df.select_dtypes(include=['object']).columns
-        mask = pd.Series([False] * len(filtered_df))
-        for col in text_cols:
-            mask |= filtered_df[col].astype(str).str.contains(search_term, case=False, na=False)
-        filtered_df = filtered_df[mask]
+        # Rows containing every word of the search (word prefixes) in any text column
+        text_cols = df.select_dtypes(include=['object', 'category']).columns
+        matches = dataset.search_index.search(table_name, search_term, text_cols)
+        if matches is not None:
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+    
+    # Only the row count is needed here; the pager and exporter take the rows they show
+    row_count = len(df) if rows is None else len(rows)
     
     # Display statistics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Rows", len(filtered_df))
+        st.metric("Total Rows", row_count)
     with col2:
-        st.metric("Total Columns", len(filtered_df.columns))
+        st.metric("Total Columns", len(df.columns))
     with col3:
         if len(df) > 0:
-            pct_filtered = (len(filtered_df) / len(df)) * 100
+            pct_filtered = (row_count / len(df)) * 100
             st.metric("Filtered %", f"{pct_filtered:.1f}%")
     
     st.markdown("---")
     
-    # Display data table
-    st.dataframe(filtered_df, use_container_width=True, height=600)
+    # Display data table; sorted and paged here so only the visible page is sent to the browser
+    view_cols = st.columns(4)
+    with view_cols[0]:
+        sort_by = st.selectbox("Sort by", ["None"] + list(df.columns))
+    with view_cols[1]:
+        sort_order = st.selectbox("Order", ["Ascending", "Descending"])
+    with view_cols[2]:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(100))
+    page_count = max(1, -(-row_count // page_size))
+    with view_cols[3]:
+        page_number = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1)
+    
+    columns = st.multiselect("Columns", list(df.columns), default=list(df.columns))
+    sort_column = None if sort_by == "None" else sort_by
+    
+    page_df = dataset.table_pager.page(
+        table_name,
+        rows,
+        sort_by=sort_column,
+        ascending=sort_order == "Ascending",
+        page=page_number - 1,
+        page_size=page_size,
+        columns=columns or None
+    )
+    first_row = (page_number - 1) * page_size
+    st.dataframe(page_df, use_container_width=True, height=600)
+    st.caption(f"Rows {min(first_row + 1, row_count):,}–{first_row + len(page_df):,} of {row_count:,}")
     
     # Export functionality
     st.markdown("---")
@@ -90,21 +114,36 @@ def render(kpi_calculator, data_loader):
     col1, col2 = st.columns(2)
     
     with col1:
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            label="Download as CSV",
-            data=csv,
-            file_name=f"{table_name}_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
+        export_formats = {"CSV": "csv", "Parquet": "parquet", "Excel": "xlsx"}
+        format_label = st.selectbox("Format", list(export_formats.keys()))
+        export_format = export_formats[format_label]
+        mime, extension = dataset.exporter.FORMATS[export_format]
+        
+        def export_file():
+            # Called only when the button is clicked; rows and columns follow the table view
+            export_rows = dataset.table_pager.ordered_rows(table_name, rows, sort_column, sort_order == "Ascending")
+            with dataset.exporter.export(table_name, export_format, export_rows, columns or None) as file:
+                return file.read()
+        
+        if export_format == 'xlsx' and row_count >= dataset.exporter.XLSX_MAX_ROWS:
+            st.warning("Too many rows for Excel; export CSV or Parquet instead")
+        else:
+            st.download_button(
+                label=f"Download as {format_label}",
+                data=export_file,
+                file_name=f"{table_name}_{pd.Timestamp.now().strftime('%Y%m%d')}{extension}",
+                mime=mime
+            )
     
     with col2:
         # Show column info
         with st.expander("Column Information"):
             st.write("**Columns:**")
-            for col in filtered_df.columns:
-                dtype = filtered_df[col].dtype
-                non_null = filtered_df[col].notna().sum()
-                null_count = filtered_df[col].isna().sum()
+            for col in df.columns:
+                dtype = df[col].dtype
+                # Counted over a mask of the filtered rows rather than a copy of them
+                not_null = df[col].notna().to_numpy()
+                non_null = int((not_null if rows is None else not_null[rows]).sum())
+                null_count = row_count - non_null
                 st.write(f"- {col}: {dtype} ({non_null} non-null, {null_count} null)")
 
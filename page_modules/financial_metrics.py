@@ -6,17 +6,21 @@ Financial performance metrics with drill-down
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
-from src.ui_components import render_kpi_card, render_filters
+from src.ui_components import FILTER_TABLES, render_kpi_card, render_filters
 
+# Tables this page reads; app.py prefetches them before rendering
+TABLES = FILTER_TABLES
 
-def render(kpi_calculator, data_loader):
+
+def render(dataset):
     """Render the Financial Metrics page"""
+    kpi_calculator, data_loader = dataset.kpi_calculator, dataset.data_loader
     
     st.markdown('<div class="main-header">Financial Metrics Dashboard</div>', unsafe_allow_html=True)
     
     # Filters
-    filters = render_filters(data_loader, location="top")
+    filters = render_filters(dataset, location="top")
+    cards = kpi_calculator.compute_section('financial_metrics', filters)
     
     st.markdown("---")
     
@@ -24,19 +28,19 @@ def render(kpi_calculator, data_loader):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        value, target, status, pct = kpi_calculator.payroll_pct_revenue(filters)
+        value, target, status, pct = cards['payroll_pct_revenue']
         render_kpi_card("Payroll % of Revenue", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.chemical_spend_pct(filters)
+        value, target, status, pct = cards['chemical_spend_pct']
         render_kpi_card("Chemical Spend %", value, target, status, pct, "percentage")
     
     with col3:
-        value, target, status, pct = kpi_calculator.ebitda_margin(filters)
+        value, target, status, pct = cards['ebitda_margin']
         render_kpi_card("EBITDA Margin", value, target, status, pct, "percentage")
     
     with col4:
-        value, target, status, pct = kpi_calculator.revenue_growth_yoy(filters)
+        value, target, status, pct = cards['revenue_growth_yoy']
         render_kpi_card("Revenue Growth YoY", value, target, status, pct, "percentage")
     
     st.markdown("---")
@@ -46,9 +50,7 @@ def render(kpi_calculator, data_loader):
     
     if not services_df.empty and 'Invoice Amount' in services_df.columns:
         # Apply filters
-        filtered_services = services_df.copy()
-        if filters.get('branch') and 'Branch' in filtered_services.columns:
-            filtered_services = filtered_services[filtered_services['Branch'] == filters['branch']]
+        filtered_services = kpi_calculator.filter_engine.filter('completed_services', filters, ['branch', 'date_range'])
         
         # Payroll % Gauge
         col1, col2 = st.columns(2)
@@ -111,8 +113,7 @@ def render(kpi_calculator, data_loader):
         
         # EBITDA Margin Trend
         st.subheader("EBITDA Margin Trend")
-        if 'Service Date' in filtered_services.columns:
-            filtered_services['Year Month'] = pd.to_datetime(filtered_services['Service Date']).dt.to_period('M')
+        if 'Year Month' in filtered_services.columns:
             monthly_revenue = filtered_services.groupby('Year Month')['Invoice Amount'].sum().reset_index()
             monthly_revenue['Year Month'] = monthly_revenue['Year Month'].astype(str)
             
@@ -134,8 +135,7 @@ def render(kpi_calculator, data_loader):
         
         # Revenue Growth YoY
         st.subheader("Revenue Growth YoY")
-        if 'Service Date' in filtered_services.columns:
-            filtered_services['Year'] = pd.to_datetime(filtered_services['Service Date']).dt.year
+        if 'Year' in filtered_services.columns:
             yearly_revenue = filtered_services.groupby('Year')['Invoice Amount'].sum().reset_index()
             yearly_revenue = yearly_revenue.sort_values('Year')
             
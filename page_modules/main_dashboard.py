@@ -4,16 +4,21 @@ KPI Scorecard with all key metrics
 """
 
 import streamlit as st
-from src.ui_components import render_kpi_card, render_filters
+from src.ui_components import FILTER_TABLES, render_kpi_card, render_filters
 
+# Tables this page reads; app.py prefetches them before rendering
+TABLES = FILTER_TABLES + ['tech_reviews', 'customer_reviews']
 
-def render(kpi_calculator, data_loader):
+
+def render(dataset):
     """Render the main dashboard page"""
+    kpi_calculator, data_loader = dataset.kpi_calculator, dataset.data_loader
     
     st.markdown('<div class="main-header">FLPP Performance Dashboard</div>', unsafe_allow_html=True)
     
     # Filters
-    filters = render_filters(data_loader, location="top")
+    filters = render_filters(dataset, location="top")
+    cards = kpi_calculator.compute_all(filters)
     
     st.markdown("---")
     
@@ -22,19 +27,19 @@ def render(kpi_calculator, data_loader):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        value, target, status, pct = kpi_calculator.monthly_sales_per_rep(filters)
+        value, target, status, pct = cards['monthly_sales_per_rep']
         render_kpi_card("Monthly Sales per Rep", value, target, status, pct, "currency")
     
     with col2:
-        value, target, status, pct = kpi_calculator.recurring_sales_pct(filters)
+        value, target, status, pct = cards['recurring_sales_pct']
         render_kpi_card("Recurring Sales %", value, target, status, pct, "percentage")
     
     with col3:
-        value, target, status, pct = kpi_calculator.organic_growth_yoy(filters)
+        value, target, status, pct = cards['organic_growth_yoy']
         render_kpi_card("Organic Growth YoY", value, target, status, pct, "percentage")
     
     with col4:
-        value, target, status, pct = kpi_calculator.cancellation_rate(filters)
+        value, target, status, pct = cards['cancellation_rate']
         render_kpi_card("Cancellation Rate", value, target, status, pct, "percentage")
     
     st.markdown("---")
@@ -44,19 +49,19 @@ def render(kpi_calculator, data_loader):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        value, target, status, pct = kpi_calculator.completion_rate(filters)
+        value, target, status, pct = cards['completion_rate']
         render_kpi_card("Completion Rate", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.tech_review_score(filters)
+        value, target, status, pct = cards['tech_review_score']
         render_kpi_card("Tech Review Score", value, target, status, pct, "rating")
     
     with col3:
-        value, target, status, pct = kpi_calculator.recurring_service_ratio(filters)
+        value, target, status, pct = cards['recurring_service_ratio']
         render_kpi_card("Recurring Service Ratio", value, target, status, pct, "percentage")
     
     with col4:
-        value, target, status, pct = kpi_calculator.service_accuracy(filters)
+        value, target, status, pct = cards['service_accuracy']
         render_kpi_card("Service Accuracy", value, target, status, pct, "percentage")
     
     st.markdown("---")
@@ -66,19 +71,19 @@ def render(kpi_calculator, data_loader):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        value, target, status, pct = kpi_calculator.payroll_pct_revenue(filters)
+        value, target, status, pct = cards['payroll_pct_revenue']
         render_kpi_card("Payroll % of Revenue", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.chemical_spend_pct(filters)
+        value, target, status, pct = cards['chemical_spend_pct']
         render_kpi_card("Chemical Spend %", value, target, status, pct, "percentage")
     
     with col3:
-        value, target, status, pct = kpi_calculator.ebitda_margin(filters)
+        value, target, status, pct = cards['ebitda_margin']
         render_kpi_card("EBITDA Margin", value, target, status, pct, "percentage")
     
     with col4:
-        value, target, status, pct = kpi_calculator.revenue_growth_yoy(filters)
+        value, target, status, pct = cards['revenue_growth_yoy']
         render_kpi_card("Revenue Growth YoY", value, target, status, pct, "percentage")
     
     st.markdown("---")
@@ -88,11 +93,11 @@ def render(kpi_calculator, data_loader):
     col1, col2 = st.columns(2)
     
     with col1:
-        value, target, status, pct = kpi_calculator.auto_pay_enrollment(filters)
+        value, target, status, pct = cards['auto_pay_enrollment']
         render_kpi_card("Auto Pay Enrollment", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.avg_customer_review(filters)
+        value, target, status, pct = cards['avg_customer_review']
         render_kpi_card("Avg Customer Review", value, target, status, pct, "rating")
     
     st.markdown("---")
@@ -117,14 +122,14 @@ def render(kpi_calculator, data_loader):
         """, unsafe_allow_html=True)
     
     with col2:
-        value, target, status, pct = kpi_calculator.total_ytd_revenue(filters)
+        value, target, status, pct = cards['total_ytd_revenue']
         render_kpi_card("Total YTD Revenue", value, target, status, pct, "currency")
     
     with col3:
-        value, target, status, pct = kpi_calculator.avg_monthly_production_per_tech(filters)
+        value, target, status, pct = cards['avg_monthly_production_per_tech']
         render_kpi_card("Avg Monthly Production per Tech", value, target, status, pct, "currency")
     
     with col4:
-        value, target, status, pct = kpi_calculator.recurring_sales_pct(filters)
+        value, target, status, pct = cards['recurring_sales_pct']
         render_kpi_card("Recurring % of Sales", value, target, status, pct, "percentage")
 
@@ -6,17 +6,21 @@ Detailed technician metrics with drill-down
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
-from src.ui_components import render_kpi_card, render_filters
+from src.ui_components import FILTER_TABLES, render_kpi_card, render_filters
 
+# Tables this page reads; app.py prefetches them before rendering
+TABLES = FILTER_TABLES + ['tech_reviews']
 
-def render(kpi_calculator, data_loader):
+
+def render(dataset):
     """Render the Technician Performance page"""
+    kpi_calculator, data_loader = dataset.kpi_calculator, dataset.data_loader
     
     st.markdown('<div class="main-header">Technician Performance Dashboard</div>', unsafe_allow_html=True)
     
     # Filters
-    filters = render_filters(data_loader, location="top")
+    filters = render_filters(dataset, location="top")
+    cards = kpi_calculator.compute_section('technician_performance', filters)
     
     st.markdown("---")
     
@@ -24,19 +28,19 @@ def render(kpi_calculator, data_loader):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        value, target, status, pct = kpi_calculator.completion_rate(filters)
+        value, target, status, pct = cards['completion_rate']
         render_kpi_card("Completion Rate", value, target, status, pct, "percentage")
     
     with col2:
-        value, target, status, pct = kpi_calculator.tech_review_score(filters)
+        value, target, status, pct = cards['tech_review_score']
         render_kpi_card("Tech Review Score", value, target, status, pct, "rating")
     
     with col3:
-        value, target, status, pct = kpi_calculator.recurring_service_ratio(filters)
+        value, target, status, pct = cards['recurring_service_ratio']
         render_kpi_card("Recurring Service Ratio", value, target, status, pct, "percentage")
     
     with col4:
-        value, target, status, pct = kpi_calculator.service_accuracy(filters)
+        value, target, status, pct = cards['service_accuracy']
         render_kpi_card("Service Accuracy", value, target, status, pct, "percentage")
     
     st.markdown("---")
@@ -48,21 +52,14 @@ def render(kpi_calculator, data_loader):
     
     if not services_df.empty:
         # Apply filters
-        filtered_services = services_df.copy()
-        if filters.get('branch') and 'Branch' in filtered_services.columns:
-            filtered_services = filtered_services[filtered_services['Branch'] == filters['branch']]
-        if filters.get('technician') and 'Tech Name' in filtered_services.columns:
-            filtered_services = filtered_services[filtered_services['Tech Name'] == filters['technician']]
-        if filters.get('category') and 'Category' in filtered_services.columns:
-            filtered_services = filtered_services[filtered_services['Category'] == filters['category']]
+        filtered_services = kpi_calculator.filter_engine.filter('completed_services', filters, ['branch', 'technician', 'category', 'date_range'])
         
         # Completion Rate Trend
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Completion Rate Trend")
-            if 'Service Date' in filtered_services.columns and 'Tech Name' in filtered_services.columns:
-                filtered_services['Year Month'] = pd.to_datetime(filtered_services['Service Date']).dt.to_period('M')
+            if 'Year Month' in filtered_services.columns and 'Tech Name' in filtered_services.columns:
                 monthly_completions = filtered_services.groupby('Year Month').size().reset_index(name='Completed')
                 monthly_completions['Year Month'] = monthly_completions['Year Month'].astype(str)
                 
@@ -93,34 +90,31 @@ def render(kpi_calculator, data_loader):
                 fig.update_layout(height=400, xaxis_tickangle=-45)
                 st.plotly_chart(fig, use_container_width=True)
                 
-                # Drill-down selector
-                selected_tech = st.selectbox(
-                    "Select Technician to View Details",
-                    ["None"] + tech_reviews_display['Technician'].tolist()
-                )
-                
-                if selected_tech != "None":
-                    tech_services = filtered_services[filtered_services['Tech Name'] == selected_tech]
-                    st.subheader(f"Services for {selected_tech}")
-                    display_cols = ['Customer Name', 'Service Date', 'Category', 'Type', 'Invoice Amount']
-                    available_cols = [col for col in display_cols if col in tech_services.columns]
-                    st.dataframe(tech_services[available_cols].head(20), use_container_width=True)
+                render_tech_drilldown(filtered_services, tech_reviews_display['Technician'].tolist())
         
         # Recurring Service Ratio
         st.subheader("Recurring Service Ratio by Technician")
         if 'Tech Name' in filtered_services.columns and 'Customer Id' in filtered_services.columns:
-            # Merge with customer detail for auto pay
+            # Look up auto pay per service from customer detail
             if not customer_df.empty and 'Customer Id' in customer_df.columns:
-                merged = filtered_services.merge(
-                    customer_df[['Customer Id', 'Auto Pay Flag']],
-                    on='Customer Id',
-                    how='left'
+                tech_services = filtered_services[['Tech Name', 'Customer Id']].assign(
+                    **{'Auto Pay Rows': kpi_calculator.auto_pay_counts(filtered_services['Customer Id'])}
                 )
                 
-                tech_recurring = merged.groupby('Tech Name').agg({
-                    'Customer Id': 'nunique',
-                    'Auto Pay Flag': lambda x: (x == True).sum()
-                }).reset_index()
+                distinct_counter = kpi_calculator.distinct_counter
+                if distinct_counter is not None:
+                    # Distinct customers per tech merged from sketches instead of one hash table per tech
+                    tech_recurring = tech_services.groupby('Tech Name', observed=True)[['Auto Pay Rows']].sum()
+                    customers = distinct_counter.count_by(
+                        'completed_services', 'Customer Id', 'technician', filters, ['branch', 'technician', 'category', 'date_range']
+                    )
+                    tech_recurring.insert(0, 'Customer Id', customers.reindex(tech_recurring.index, fill_value=0).to_numpy())
+                    tech_recurring = tech_recurring.reset_index()
+                else:
+                    tech_recurring = tech_services.groupby('Tech Name', observed=True).agg({
+                        'Customer Id': 'nunique',
+                        'Auto Pay Rows': 'sum'
+                    }).reset_index()
                 tech_recurring.columns = ['Tech Name', 'Total Customers', 'Recurring Customers']
                 tech_recurring['Recurring Ratio'] = tech_recurring['Recurring Customers'] / tech_recurring['Total Customers']
                 tech_recurring = tech_recurring.sort_values('Recurring Ratio', ascending=False)
@@ -137,13 +131,8 @@ def render(kpi_calculator, data_loader):
         
         # Service Accuracy Gauge
         st.subheader("Service Accuracy")
-        callback_keywords = ['Callback', 'Call-back']
-        callback_mask = (
-            filtered_services['Type'].astype(str).str.contains('|'.join(callback_keywords), case=False, na=False) |
-            filtered_services['Name'].astype(str).str.contains('|'.join(callback_keywords), case=False, na=False)
-        )
         total_services = len(filtered_services)
-        callback_services = callback_mask.sum()
+        callback_services = filtered_services['Is Callback'].sum() if 'Is Callback' in filtered_services.columns else 0
         accuracy = (total_services - callback_services) / total_services if total_services > 0 else 0
         
         fig = go.Figure(go.Indicator(
@@ -174,3 +163,19 @@ def render(kpi_calculator, data_loader):
         available_cols = [col for col in display_cols if col in filtered_services.columns]
         st.dataframe(filtered_services[available_cols].head(100), use_container_width=True)
 
+
+@st.fragment
+def render_tech_drilldown(filtered_services, technicians):
+    """Technician drill-down; changing the selection reruns only this fragment, with the inputs of the last full run"""
+    # Drill-down selector
+    selected_tech = st.selectbox(
+        "Select Technician to View Details",
+        ["None"] + technicians
+    )
+    
+    if selected_tech != "None":
+        tech_services = filtered_services[filtered_services['Tech Name'] == selected_tech]
+        st.subheader(f"Services for {selected_tech}")
+        display_cols = ['Customer Name', 'Service Date', 'Category', 'Type', 'Invoice Amount']
+        available_cols = [col for col in display_cols if col in tech_services.columns]
+        st.dataframe(tech_services[available_cols].head(20), use_container_width=True)
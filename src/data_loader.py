@@ -5,17 +5,109 @@ Handles loading and preprocessing of Excel data
 
 import pandas as pd
 import numpy as np
+import openpyxl
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import hashlib
+import io
+import json
+import multiprocessing
+import os
 import re
+import shutil
+import tempfile
+import threading
 import warnings
+from pandas._libs.parsers import STR_NA_VALUES
+
+
+class WorkbookChangedError(Exception):
+    """The workbook on disk is no longer the one the loader's data version was fingerprinted from"""
 
 
 class DataLoader:
     """Loads and preprocesses data from Excel file"""
     
-    def __init__(self, file_path):
+    # Bump whenever the cleaning logic changes so stale caches are rebuilt
+    CACHE_VERSION = 9
+    
+    # Tables available through get_data(); date_table is derived from completed_services
+    TABLES = [
+        'completed_services', 'sales_by_tech', 'lost_sales', 'customer_detail',
+        'tech_reviews', 'customer_reviews', 'top_rep_index', 'financials', 'date_table'
+    ]
+    
+    # Low-cardinality text columns stored as categoricals; columns of the same
+    # dimension share one category dictionary across every table
+    DIMENSION_COLUMNS = {
+        'Branch': 'branch',
+        'Category': 'category',
+        'Type': 'type',
+        'Tech Name': 'technician',
+        'Primary Sales Rep': 'sales_rep',
+        'Sales Rep': 'sales_rep',
+        'Status': 'status',
+        'Payment Type': 'payment_type',
+        'City': 'city',
+        'State': 'state',
+        'Account Type': 'account_type'
+    }
+    
+    # Fact table -> (date column, prefix) pairs that get Date Key, Year, Quarter and period keys at load
+    DATE_COLUMNS = {
+        'completed_services': [('Service Date', '')],
+        'sales_by_tech': [('Sold Date', '')],
+        'lost_sales': [('Sold Date', '')],
+        'customer_reviews': [('Service Date', ''), ('Review Date', 'Review ')]
+    }
+    
+    # Fact table -> boolean flag -> (source columns, keywords matched case-insensitively in any of them)
+    FLAG_COLUMNS = {
+        'completed_services': {'Is Callback': (['Type', 'Name', 'Category'], ['Callback', 'Call-back'])},
+        'sales_by_tech': {'Is Recurring': (['Category'], ['Monthly', 'Bi-Monthly', 'Quarterly', 'Recurring'])}
+    }
+    
+    # Fact tables whose exports only grow at the end -> (sheet, cleaning method); refresh() cleans just the new rows
+    APPEND_ONLY_TABLES = {
+        'completed_services': ('Completed Services', '_clean_completed_services'),
+        'sales_by_tech': ('Sales by Tech', '_clean_sales_by_tech')
+    }
+    
+    # Workbook-backed tables and the method that loads and cleans each one
+    SHEET_LOADERS = {
+        'completed_services': 'load_completed_services',
+        'sales_by_tech': 'load_sales_by_tech',
+        'lost_sales': 'load_lost_sales',
+        'customer_detail': 'load_customer_detail',
+        'tech_reviews': 'load_tech_reviews',
+        'customer_reviews': 'load_customer_reviews',
+        'top_rep_index': 'load_top_rep_index',
+        'financials': 'load_financials'
+    }
+    
+    def __init__(self, file_path, cache_dir=None, use_cache=True, streaming=False, chunk_size=50000):
         self.file_path = file_path
         self.data = {}
+        self.use_cache = use_cache
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(file_path)), '.cache')
+        self.cache_dir = cache_dir
+        self.data_version = None
+        self._fingerprint = None
+        # Tables already loaded (or attempted, for a date table without dates)
+        self._loaded = set()
+        self._lock = threading.RLock()
+        # Shared category dictionary per dimension (append-only, so codes stay stable)
+        self.categories = {}
+        # Streaming mode reads the large sheets row by row in fixed-size chunks
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        # Open workbook shared by the load_* methods during a bulk load
+        self._workbook = None
+        # Cleaned rows refresh() appended per table, for incremental aggregates
+        self.appended_rows = {}
+        # Hash of every raw sheet row of the append-only tables, so refresh() can verify earlier rows are unchanged
+        self.row_hashes = {}
         
     def clean_currency(self, value):
         """Clean currency string and convert to float"""
@@ -43,18 +135,219 @@ class DataLoader:
         except:
             return None
     
+    def clean_currency_series(self, series):
+        """Vectorized clean_currency for a whole column; unlike clean_currency, the text 'nan' becomes 0.0 like any missing amount"""
+        # Blanks and unparseable text become 0.0
+        return self._parse_cells(series, currency=True).fillna(0.0)
+    
+    def clean_numeric_id_series(self, series):
+        """Vectorized clean_numeric_id for a whole column; unparseable IDs become NaN"""
+        values = self._parse_cells(series)
+        # int(float(x)) truncates toward zero and rejects infinities
+        values = np.trunc(values.where(np.isfinite(values)))
+        if len(values) > 0 and values.notna().all():
+            return values.astype('int64')
+        return values
+    
+    def _parse_cells(self, series, currency=False):
+        """Parse a column of numbers and text to float64, removing $, commas and spaces from currency text"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float)
+        # Numeric cells of a mixed column are taken as they are; formatting them as text to parse them back is slow
+        numbers = series.map(type).isin([float, int, bool]).to_numpy()
+        text = series[~numbers].astype('string[pyarrow]')
+        if currency:
+            text = text.str.replace('$', '', regex=False).str.replace(',', '', regex=False)
+        values = np.empty(len(series))
+        values[numbers] = series[numbers].astype(float).to_numpy()
+        values[~numbers] = self._parse_float_text(text.str.strip()).to_numpy()
+        return pd.Series(values, index=series.index)
+    
+    def _parse_float_text(self, text):
+        """Parse stripped strings to float64, with NaN for blanks and unparseable values"""
+        text = text.mask(text == '')
+        try:
+            # Arrow parses a fully numeric column in a single pass
+            return text.astype('float64[pyarrow]').astype(float)
+        except (ValueError, TypeError):
+            # Null out the entries Arrow cannot parse, then parse the rest
+            valid = text.str.fullmatch(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|[+-]?(inf|infinity|nan)', case=False).fillna(False)
+            values = text.where(valid).astype('float64[pyarrow]').astype(float)
+            # float() also takes digit separators and non-ASCII digits ('1_000', '１２'); only text holding those is tried, once per distinct value
+            rest = (~valid & text.str.contains(r'_|[^\x00-\x7f]').fillna(False)).to_numpy()
+            if rest.any():
+                leftovers = text[rest].astype(object)
+                parsed = {value: self._float_or_nan(value) for value in leftovers.unique()}
+                values = values.to_numpy(copy=True)
+                values[rest] = leftovers.map(parsed).to_numpy(dtype=float)
+                values = pd.Series(values, index=text.index)
+            return values
+    
+    def _float_or_nan(self, text):
+        """float(text), or NaN where float() rejects it"""
+        try:
+            return float(text)
+        except ValueError:
+            return np.nan
+    
+    def _read_sheet(self, sheet_name):
+        """Read a raw sheet, reusing the open workbook when there is one"""
+        source = self._workbook if self._workbook is not None else self.file_path
+        return pd.read_excel(source, sheet_name=sheet_name)
+    
+    # ============================================================================
+    # STREAMING READER
+    # ============================================================================
+    
+    def _stream_sheet(self, sheet_name, clean, header_row=0, drop_empty_columns=False, table_name=None):
+        """Read a sheet with openpyxl read_only, cleaning it in fixed-size chunks; raw row hashes are recorded under table_name if given"""
+        # Cleaned chunks go into per-column buffers, so peak memory stays close to
+        # the final typed frame instead of the whole sheet as raw object columns
+        workbook = self._workbook.book if self._workbook is not None else None
+        owns_workbook = workbook is None
+        if owns_workbook:
+            workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True, keep_links=False)
+        
+        try:
+            worksheet = workbook[sheet_name]
+            if getattr(worksheet, 'reset_dimensions', None):
+                worksheet.reset_dimensions()
+            
+            promoted_header = header_row > 0
+            columns = None
+            chunk = []
+            offset = 0
+            # Index and per-column cleaned values of every flushed chunk
+            chunk_indexes = []
+            column_chunks = {}
+            non_empty_columns = set()
+            hash_chunks = []
+            
+            def flush():
+                nonlocal offset
+                # A promoted header row made every raw column object-typed in read_excel
+                raw = [pd.DataFrame(
+                    chunk, columns=columns, index=pd.RangeIndex(offset, offset + len(chunk)),
+                    dtype=object if promoted_header else None
+                )]
+                offset += len(chunk)
+                chunk.clear()
+                if drop_empty_columns:
+                    non_empty_columns.update(raw[0].columns[raw[0].notna().any()])
+                if table_name is not None:
+                    hash_chunks.append(self._row_hashes(raw[0]))
+                
+                # Hand the only reference to clean() so its row filters don't warn about copies
+                df = clean(raw.pop())
+                for col in df.columns:
+                    column_chunks.setdefault(col, [None] * len(chunk_indexes)).append(df[col])
+                chunk_indexes.append(df.index)
+                for parts in column_chunks.values():
+                    if len(parts) < len(chunk_indexes):
+                        parts.append(None)
+            
+            def append(values):
+                chunk.append(values)
+                if len(chunk) >= self.chunk_size:
+                    flush()
+            
+            # Blank rows inside the sheet are kept like read_excel does; trailing ones are trimmed
+            pending_blank_rows = 0
+            for row in worksheet.iter_rows(values_only=True):
+                if all(value is None for value in row):
+                    if columns is not None:
+                        pending_blank_rows += 1
+                    continue
+                if columns is None:
+                    if header_row > 0:
+                        header_row -= 1
+                        continue
+                    columns = self._stream_header(row, promoted=promoted_header)
+                    continue
+                
+                values = [self._stream_cell(value) for value in row]
+                if len(values) > len(columns):
+                    columns = columns + [f'Unnamed: {i}' for i in range(len(columns), len(values))]
+                for _ in range(pending_blank_rows):
+                    append([np.nan] * len(columns))
+                pending_blank_rows = 0
+                values.extend([np.nan] * (len(columns) - len(values)))
+                append(values)
+            
+            if columns is None:
+                return pd.DataFrame()
+            if chunk or not chunk_indexes:
+                flush()
+        finally:
+            if owns_workbook:
+                workbook.close()
+        
+        if table_name is not None:
+            self.row_hashes[table_name] = np.concatenate(hash_chunks)
+        
+        # Assemble one column at a time so raw chunks are released as we go
+        data = {}
+        for col in list(column_chunks):
+            if drop_empty_columns and col in columns and col not in non_empty_columns:
+                del column_chunks[col]
+                continue
+            parts = column_chunks.pop(col)
+            parts = [
+                part if part is not None else pd.Series(np.nan, index=index, dtype=object)
+                for part, index in zip(parts, chunk_indexes)
+            ]
+            data[col] = pd.concat(parts) if len(parts) > 1 else parts[0]
+        
+        return pd.DataFrame(data, copy=False)
+    
+    def _stream_header(self, row, promoted=False):
+        """Column names for a streamed sheet, named the way read_excel names them"""
+        if promoted:
+            # Header rows taken from the data keep read_excel's NaN for blank cells
+            return [np.nan if value is None else value for value in row]
+        
+        columns = []
+        seen = {}
+        for i, value in enumerate(row):
+            name = f'Unnamed: {i}' if value is None or value == '' else value
+            if name in seen:
+                seen[name] += 1
+                name = f'{name}.{seen[name]}'
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+    
+    def _stream_cell(self, value):
+        """Convert a raw openpyxl value the way read_excel does"""
+        # Text such as 'n/a' or 'NULL' is one of read_excel's default missing values
+        if value is None or (isinstance(value, str) and value in STR_NA_VALUES):
+            return np.nan
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+    
     def load_completed_services(self):
         """Load and clean Completed Services sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Completed Services')
+        if self.streaming:
+            return self._stream_sheet('Completed Services', self._clean_completed_services, drop_empty_columns=True,
+                                      table_name='completed_services')
+        
+        df = self._read_sheet('Completed Services')
+        self.row_hashes['completed_services'] = self._row_hashes(df)
         
         # Remove empty columns
         df = df.dropna(axis=1, how='all')
         
+        return self._clean_completed_services(df)
+    
+    def _clean_completed_services(self, df):
+        """Clean a Completed Services frame (whole sheet or one streamed chunk)"""
         # Clean currency columns
         if 'Appt Amount' in df.columns:
-            df['Appt Amount'] = df['Appt Amount'].apply(self.clean_currency)
+            df['Appt Amount'] = self.clean_currency_series(df['Appt Amount'])
         if 'Invoice Amount' in df.columns:
-            df['Invoice Amount'] = df['Invoice Amount'].apply(self.clean_currency)
+            df['Invoice Amount'] = self.clean_currency_series(df['Invoice Amount'])
         
         # Clean date column
         if 'Service Date' in df.columns:
@@ -70,20 +363,27 @@ class DataLoader:
         
         # Clean Customer Id
         if 'Customer Id' in df.columns:
-            df['Customer Id'] = df['Customer Id'].apply(self.clean_numeric_id)
+            df['Customer Id'] = self.clean_numeric_id_series(df['Customer Id'])
             df = df[df['Customer Id'].notna()]
         
         return df
     
     def load_sales_by_tech(self):
         """Load and clean Sales by Tech sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Sales by Tech')
+        if self.streaming:
+            return self._stream_sheet('Sales by Tech', self._clean_sales_by_tech, table_name='sales_by_tech')
         
+        df = self._read_sheet('Sales by Tech')
+        self.row_hashes['sales_by_tech'] = self._row_hashes(df)
+        return self._clean_sales_by_tech(df)
+    
+    def _clean_sales_by_tech(self, df):
+        """Clean a Sales by Tech frame (whole sheet or one streamed chunk)"""
         # Clean currency columns
         currency_cols = ['Init Price', 'Reg Price', 'Contract Value']
         for col in currency_cols:
             if col in df.columns:
-                df[col] = df[col].apply(self.clean_currency)
+                df[col] = self.clean_currency_series(df[col])
         
         # Clean date column
         if 'Sold Date' in df.columns:
@@ -93,7 +393,7 @@ class DataLoader:
         
         # Clean Customer Id
         if 'Customer Id' in df.columns:
-            df['Customer Id'] = df['Customer Id'].apply(self.clean_numeric_id)
+            df['Customer Id'] = self.clean_numeric_id_series(df['Customer Id'])
             df = df[df['Customer Id'].notna()]
         
         # Clean text columns
@@ -106,11 +406,18 @@ class DataLoader:
     
     def load_lost_sales(self):
         """Load and clean Lost Sales sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Lost Sales')
+        if self.streaming:
+            return self._stream_sheet('Lost Sales', self._clean_lost_sales, drop_empty_columns=True)
+        
+        df = self._read_sheet('Lost Sales')
         
         # Remove empty columns
         df = df.dropna(axis=1, how='all')
         
+        return self._clean_lost_sales(df)
+    
+    def _clean_lost_sales(self, df):
+        """Clean a Lost Sales frame (whole sheet or one streamed chunk)"""
         # Clean date column
         if 'Sold Date' in df.columns:
             with warnings.catch_warnings():
@@ -127,41 +434,49 @@ class DataLoader:
     
     def load_customer_detail(self):
         """Load and clean Customer Detail sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Customer Detail')
+        if self.streaming:
+            # The real headers are on the second row of the sheet
+            return self._stream_sheet('Customer Detail', self._clean_customer_detail, header_row=1)
+        
+        df = self._read_sheet('Customer Detail')
         
         # First row contains headers - use it
         if df.shape[0] > 0:
             # Get first row as headers
             first_row = df.iloc[0]
             df.columns = first_row.values
-            df = df.iloc[1:].reset_index(drop=True)
-            
-            # Clean Customer Id
-            if 'Customer Id' in df.columns:
-                df['Customer Id'] = df['Customer Id'].apply(self.clean_numeric_id)
-                df = df[df['Customer Id'].notna()]
-            
-            # Convert Auto Pay to boolean
-            if 'Auto Pay' in df.columns:
-                df['Auto Pay Flag'] = df['Auto Pay'].astype(str).str.upper().isin(['YES', 'Y', 'TRUE', '1'])
-            
-            # Clean numeric columns
-            numeric_cols = ['Balance', 'Overdue Balance', 'Days Late']
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            
-            # Clean text columns
-            text_cols = ['Status', 'Branch', 'Payment Type', 'City', 'State', 'Account Type']
-            for col in text_cols:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.strip()
+            return self._clean_customer_detail(df.iloc[1:].reset_index(drop=True))
+        
+        return df
+    
+    def _clean_customer_detail(self, df):
+        """Clean a Customer Detail frame (whole sheet or one streamed chunk)"""
+        # Clean Customer Id
+        if 'Customer Id' in df.columns:
+            df['Customer Id'] = self.clean_numeric_id_series(df['Customer Id'])
+            df = df[df['Customer Id'].notna()]
+        
+        # Convert Auto Pay to boolean
+        if 'Auto Pay' in df.columns:
+            df['Auto Pay Flag'] = df['Auto Pay'].astype(str).str.upper().isin(['YES', 'Y', 'TRUE', '1'])
+        
+        # Clean numeric columns
+        numeric_cols = ['Balance', 'Overdue Balance', 'Days Late']
+        for col in numeric_cols:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        
+        # Clean text columns
+        text_cols = ['Status', 'Branch', 'Payment Type', 'City', 'State', 'Account Type']
+        for col in text_cols:
+            if col in df.columns:
+                df[col] = df[col].astype(str).str.strip()
         
         return df
     
     def load_tech_reviews(self):
         """Load and clean Tech Reviews sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Tech Reviews')
+        df = self._read_sheet('Tech Reviews')
         
         # Skip first row if it's a header
         if df.shape[0] > 0:
@@ -186,7 +501,7 @@ class DataLoader:
     
     def load_customer_reviews(self):
         """Load and clean Customer Reviews sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Customer Reviews')
+        df = self._read_sheet('Customer Reviews')
         
         # Skip first row if it's a header
         if df.shape[0] > 0:
@@ -205,7 +520,7 @@ class DataLoader:
             
             # Clean Customer Id
             if 'Customer Id' in df.columns:
-                df['Customer Id'] = df['Customer Id'].apply(self.clean_numeric_id)
+                df['Customer Id'] = self.clean_numeric_id_series(df['Customer Id'])
                 df = df[df['Customer Id'].notna()]
             
             # Clean text columns
@@ -224,7 +539,7 @@ class DataLoader:
     
     def load_top_rep_index(self):
         """Load and clean Top Rep Index sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Top Rep Index')
+        df = self._read_sheet('Top Rep Index')
         
         # Skip first row if it's a header
         if df.shape[0] > 0:
@@ -251,7 +566,7 @@ class DataLoader:
     
     def load_financials(self):
         """Load and clean Financials sheet"""
-        df = pd.read_excel(self.file_path, sheet_name='Financials')
+        df = self._read_sheet('Financials')
         
         # Financials structure may vary - basic cleaning
         # Remove header rows
@@ -261,26 +576,425 @@ class DataLoader:
         
         return df
     
-    def load_all_data(self):
-        """Load all sheets"""
+    def load_all_data(self, parallel=False, max_workers=None):
+        """Load all sheets, reusing the on-disk cache when the workbook is unchanged"""
         try:
-            self.data['completed_services'] = self.load_completed_services()
-            self.data['sales_by_tech'] = self.load_sales_by_tech()
-            self.data['lost_sales'] = self.load_lost_sales()
-            self.data['customer_detail'] = self.load_customer_detail()
-            self.data['tech_reviews'] = self.load_tech_reviews()
-            self.data['customer_reviews'] = self.load_customer_reviews()
-            self.data['top_rep_index'] = self.load_top_rep_index()
-            self.data['financials'] = self.load_financials()
-            
-            # Create date range for date table
-            self._create_date_table()
-            
+            self.prefetch(self.TABLES, parallel=parallel, max_workers=max_workers)
             return True
         except Exception as e:
             print(f"Error loading data: {str(e)}")
             raise
     
+    def prefetch(self, table_names, parallel=False, max_workers=None):
+        """Load the given tables now; cache misses are parsed in one workbook pass"""
+        with self._lock:
+            self._ensure_fingerprint()
+            requested = set(table_names)
+            if 'date_table' in requested:
+                requested.add('completed_services')
+            
+            # Work in TABLES order so the category dictionaries are deterministic
+            missing = [name for name in self.TABLES if name in requested and name not in self._loaded]
+            sheets = []
+            for table_name in missing:
+                if table_name == 'date_table':
+                    continue
+                cached = self._read_cached_table(table_name) if self.use_cache else None
+                if cached is not None:
+                    self._add_table(table_name, cached)
+                else:
+                    sheets.append(table_name)
+            
+            if sheets:
+                # Sheets parsed now must come from the workbook the data version describes
+                self._check_workbook_unchanged()
+                # In parallel mode load time is bounded by the largest sheet, not the sum
+                if parallel and len(sheets) > 1:
+                    tables = self._load_sheets_parallel(sheets, max_workers)
+                else:
+                    tables = self._load_sheets(sheets)
+                for table_name in sheets:
+                    self._add_table(table_name, self._add_derived_columns(table_name, tables[table_name]))
+                    if self.use_cache:
+                        self._write_cached_table(table_name)
+            
+            if 'date_table' in missing:
+                cached = self._read_cached_table('date_table') if self.use_cache else None
+                if cached is not None:
+                    self.data['date_table'] = cached
+                else:
+                    # Create date range for date table
+                    self._create_date_table()
+                    if self.use_cache and 'date_table' in self.data:
+                        self._write_cached_table('date_table')
+                self._loaded.add('date_table')
+    
+    def _add_table(self, table_name, df):
+        """Register a cleaned table, encoding it against the shared dictionaries"""
+        self.data[table_name] = self._encode_dimensions(df)
+        self._sync_categories()
+        self._loaded.add(table_name)
+    
+    def _load_sheets(self, table_names, source=None):
+        """Load the given sheets in order from a single open workbook"""
+        tables = {}
+        with pd.ExcelFile(source if source is not None else self.file_path) as workbook:
+            self._workbook = workbook
+            try:
+                for table_name in table_names:
+                    tables[table_name] = getattr(self, self.SHEET_LOADERS[table_name])()
+            finally:
+                self._workbook = None
+        return tables
+    
+    def _load_sheets_parallel(self, table_names, max_workers=None):
+        """Fan the per-sheet parse and cleaning out across a process pool"""
+        with open(self.file_path, 'rb') as f:
+            content = f.read()
+        if hashlib.sha256(content).hexdigest() != self._fingerprint['sha256']:
+            raise WorkbookChangedError(f"{self.file_path} changed since data version {self.data_version} was fingerprinted")
+        
+        if max_workers is None:
+            max_workers = min(len(table_names), os.cpu_count() or 1)
+        
+        try:
+            # Spawned workers start clean instead of forking the server's threads and locks
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = {
+                    table_name: executor.submit(
+                        _load_sheet_from_bytes, self.file_path, content, table_name,
+                        self.streaming, self.chunk_size
+                    )
+                    for table_name in table_names
+                }
+                tables = {}
+                for table_name, future in futures.items():
+                    tables[table_name], row_hashes = future.result()
+                    if row_hashes is not None:
+                        self.row_hashes[table_name] = row_hashes
+                return tables
+        except (OSError, RuntimeError) as e:
+            # Process pools are unavailable in some sandboxed hosts
+            print(f"Parallel load unavailable, loading sequentially: {str(e)}")
+            return self._load_sheets(table_names, io.BytesIO(content))
+    
+    # ============================================================================
+    # DERIVED COLUMNS
+    # ============================================================================
+    
+    def _add_derived_columns(self, table_name, df):
+        """Add the date attributes and classification flags of a freshly cleaned table"""
+        return self._add_flags(table_name, self._add_date_columns(table_name, df))
+    
+    def _add_date_columns(self, table_name, df):
+        """Add Date Key, Year, Quarter and the month/quarter/week period keys for each of the table's date columns"""
+        for date_col, prefix in self.DATE_COLUMNS.get(table_name, []):
+            if date_col not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[date_col]):
+                continue
+            dates = df[date_col]
+            year = dates.dt.year
+            # YYYYMMDD, the same key as the date table's Date Key
+            df[prefix + 'Date Key'] = (year * 10000 + dates.dt.month * 100 + dates.dt.day).astype('Int32')
+            df[prefix + 'Year'] = year.astype('Int16')
+            df[prefix + 'Quarter'] = dates.dt.quarter.astype('Int8')
+            df[prefix + 'Year Month'] = dates.dt.to_period('M')
+            df[prefix + 'Year Quarter'] = dates.dt.to_period('Q')
+            df[prefix + 'Year Week'] = dates.dt.to_period('W')
+        return df
+    
+    def _add_flags(self, table_name, df):
+        """Add the table's keyword flags, e.g. Is Callback and Is Recurring"""
+        for flag, (columns, keywords) in self.FLAG_COLUMNS.get(table_name, {}).items():
+            pattern = '|'.join(keywords)
+            flag_values = np.zeros(len(df), dtype=bool)
+            for col in columns:
+                if col in df.columns:
+                    flag_values |= self._keyword_mask(df[col], pattern)
+            df[flag] = flag_values
+        return df
+    
+    def _keyword_mask(self, series, pattern):
+        """Case-insensitive pattern match, evaluated once per distinct value and broadcast to rows"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            values = series.cat.categories
+        else:
+            codes, values = pd.factorize(series)
+        matches = pd.Index(values).astype(str).str.contains(pattern, case=False, regex=True)
+        # Missing values (code -1) pick the trailing False
+        return np.append(np.asarray(matches, dtype=bool), False)[codes]
+    
+    # ============================================================================
+    # CATEGORICAL DIMENSIONS
+    # ============================================================================
+    
+    def _encode_dimensions(self, df):
+        """Store dimension columns as categoricals over the shared dictionaries"""
+        for col, dimension in self.DIMENSION_COLUMNS.items():
+            if col not in df.columns:
+                continue
+            column = df[col]
+            if not (pd.api.types.is_object_dtype(column) or isinstance(column.dtype, pd.CategoricalDtype)):
+                continue
+            
+            known = self.categories.get(dimension, pd.Index([], dtype=object))
+            values = pd.Index(column.dropna().unique())
+            new_values = values[~values.isin(known)]
+            if len(new_values) > 0:
+                known = known.append(new_values.astype(object))
+                self.categories[dimension] = known
+            df[col] = pd.Categorical(column, categories=known)
+        
+        return df
+    
+    def _sync_categories(self):
+        """Extend every loaded categorical column to its dimension's full dictionary"""
+        for df in self.data.values():
+            self._extend_categories(df)
+    
+    def _extend_categories(self, df):
+        """Extend a frame's categorical columns to their dimensions' full dictionaries, in place"""
+        for col, dimension in self.DIMENSION_COLUMNS.items():
+            if col not in df.columns or not isinstance(df[col].dtype, pd.CategoricalDtype):
+                continue
+            known = self.categories.get(dimension)
+            if known is not None and len(df[col].cat.categories) < len(known):
+                # New values are only ever appended, so existing codes stay valid
+                df[col] = df[col].cat.add_categories(known[len(df[col].cat.categories):])
+    
+    # ============================================================================
+    # INCREMENTAL REFRESH
+    # ============================================================================
+    
+    def refresh(self):
+        """Loader for the workbook as it is on disk now, reusing this loader's rows of append-only tables"""
+        loader = DataLoader(self.file_path, cache_dir=self.cache_dir, use_cache=self.use_cache,
+                            streaming=self.streaming, chunk_size=self.chunk_size)
+        loader.prefetch([])
+        if loader.data_version == self.data_version:
+            return self
+        
+        with self._lock:
+            previous_tables = {
+                table_name: (self.data[table_name], self.row_hashes.get(table_name)) for table_name in self.APPEND_ONLY_TABLES
+                if table_name in self._loaded and table_name in self.data
+            }
+            # Reused rows keep their codes, so the new loader starts from the same dictionaries
+            categories = dict(self.categories)
+        
+        with loader._lock:
+            loader.categories = categories
+            for table_name, (previous, previous_hashes) in previous_tables.items():
+                cached = loader._read_cached_table(table_name) if loader.use_cache else None
+                if cached is not None:
+                    loader._add_table(table_name, cached)
+                    continue
+                try:
+                    appended = loader._appended_rows(table_name, previous, previous_hashes)
+                except Exception as e:
+                    print(f"Could not refresh {table_name} incrementally: {str(e)}")
+                    appended = None
+                if appended is None:
+                    # Changed beyond appended rows; loaded in full on first access
+                    continue
+                
+                previous = previous.copy(deep=False)
+                loader._extend_categories(previous)
+                loader._add_table(table_name, pd.concat([previous, appended]))
+                loader.appended_rows[table_name] = appended
+                if loader.use_cache:
+                    loader._write_cached_table(table_name)
+        return loader
+    
+    def _appended_rows(self, table_name, previous, previous_hashes):
+        """Cleaned rows added to a sheet since `previous` was loaded, or None if any earlier row changed"""
+        if previous_hashes is None:
+            return None
+        sheet_name, clean = self.APPEND_ONLY_TABLES[table_name]
+        self._check_workbook_unchanged()
+        start = len(previous_hashes)
+        if self.streaming:
+            # Hash the sheet chunk by chunk, keeping only the raw rows past the previous load
+            tail = []
+            
+            def keep_tail(raw):
+                tail.append(raw.loc[start:])
+                return raw.iloc[:0, :0]
+            
+            self._stream_sheet(sheet_name, keep_tail, table_name=table_name)
+            hashes = self.row_hashes.pop(table_name, np.empty(0, dtype=np.uint64))
+            parts = [part for part in tail if len(part) > 0] or tail[:1]
+            raw = pd.concat(parts) if parts else pd.DataFrame()
+        else:
+            raw = pd.read_excel(self.file_path, sheet_name=sheet_name)
+            hashes = self._row_hashes(raw)
+            raw = raw.iloc[start:]
+        
+        # Every row loaded before must hash the same; an edit anywhere means a full reload
+        if len(hashes) < start or not np.array_equal(hashes[:start], previous_hashes):
+            return None
+        columns = [col for col in raw.columns if col in previous.columns]
+        new_columns = [col for col in raw.columns if col not in previous.columns]
+        if raw[new_columns].notna().any().any():
+            return None
+        
+        # Cleaned rows keep their sheet row position as index label
+        rows = getattr(self, clean)(raw[columns])
+        appended = self._add_derived_columns(table_name, rows.copy())
+        if any(col not in appended.columns for col in previous.columns):
+            return None
+        self.row_hashes[table_name] = hashes
+        return self._encode_dimensions(appended[list(previous.columns)])
+    
+    def _row_hashes(self, raw):
+        """Hash of each raw sheet row from its cell values alone, so it does not depend on how a column (or streamed chunk) was typed"""
+        cells = pd.DataFrame({i: self._hash_cells(raw.iloc[:, i]) for i in range(raw.shape[1])}, index=raw.index)
+        return pd.util.hash_pandas_object(cells, index=False).to_numpy()
+    
+    def _hash_cells(self, series):
+        """Column as objects with every number as float and every missing value as NaN"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype('float64').astype(object)
+        # Built directly, as Series.map would turn NaN back into NaT in date columns
+        return pd.Series([self._hash_cell(value) for value in series.to_numpy(dtype=object)], index=series.index, dtype=object)
+    
+    def _hash_cell(self, value):
+        """One cell normalized for hashing"""
+        if isinstance(value, (bool, int, float, np.number)):
+            return float(value)
+        if isinstance(value, str):
+            # read_excel turns numeric text into numbers when its whole column converts; streamed chunks may not
+            try:
+                return float(value)
+            except ValueError:
+                return value
+        if pd.isna(value):
+            return np.nan
+        return value
+    
+    # ============================================================================
+    # ON-DISK CACHE
+    # ============================================================================
+    
+    def _ensure_fingerprint(self):
+        """Fingerprint the workbook once; it also serves as the data version"""
+        if self._fingerprint is None:
+            self._fingerprint = self._workbook_fingerprint()
+            self.data_version = self._cache_key(self._fingerprint)
+        return self._fingerprint
+    
+    def _check_workbook_unchanged(self):
+        """Raise WorkbookChangedError if the workbook's size or modification time differ from the fingerprint"""
+        stat = os.stat(self.file_path)
+        if stat.st_size != self._fingerprint['size'] or stat.st_mtime_ns != self._fingerprint['mtime_ns']:
+            raise WorkbookChangedError(f"{self.file_path} changed since data version {self.data_version} was fingerprinted")
+    
+    def _workbook_fingerprint(self):
+        """Identify the workbook contents and the cleaning logic that produced the cache"""
+        stat = os.stat(self.file_path)
+        digest = hashlib.sha256()
+        with open(self.file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest(),
+            'cache_version': self.CACHE_VERSION
+        }
+    
+    def _cache_key(self, fingerprint):
+        """Short, stable key for a workbook fingerprint"""
+        raw = json.dumps(fingerprint, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    
+    def _read_manifest(self):
+        """Manifest of the tables cached for the current workbook, or None"""
+        manifest_path = os.path.join(self.cache_dir, self.data_version, 'manifest.json')
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('fingerprint') == self._fingerprint else None
+    
+    def _read_cached_table(self, table_name):
+        """Read one table from the cache; returns None on a miss"""
+        manifest = self._read_manifest()
+        file_name = manifest['tables'].get(table_name) if manifest else None
+        if file_name is None:
+            return None
+        
+        table_path = os.path.join(self.cache_dir, self.data_version, file_name)
+        hashes_name = manifest.get('row_hashes', {}).get(table_name)
+        try:
+            if hashes_name is not None:
+                self.row_hashes[table_name] = np.load(os.path.join(self.cache_dir, self.data_version, hashes_name))
+            if file_name.endswith('.parquet'):
+                return pd.read_parquet(table_path)
+            return pd.read_pickle(table_path)
+        except Exception as e:
+            print(f"Ignoring unreadable data cache: {str(e)}")
+            self.row_hashes.pop(table_name, None)
+            return None
+    
+    def _write_cached_table(self, table_name):
+        """Persist one cleaned table; failures never block loading"""
+        cache_path = os.path.join(self.cache_dir, self.data_version)
+        try:
+            if not os.path.isdir(cache_path):
+                os.makedirs(cache_path)
+                # Drop caches of older workbooks
+                for entry in os.listdir(self.cache_dir):
+                    if entry != self.data_version:
+                        shutil.rmtree(os.path.join(self.cache_dir, entry), ignore_errors=True)
+            
+            file_name = self._write_table_file(cache_path, table_name, self.data[table_name])
+            
+            manifest = self._read_manifest() or {'fingerprint': self._fingerprint, 'tables': {}}
+            manifest['tables'][table_name] = file_name
+            if table_name in self.row_hashes:
+                hashes_name = f'{table_name}.rows.npy'
+                
+                def write_hashes(path):
+                    with open(path, 'wb') as f:
+                        np.save(f, self.row_hashes[table_name])
+                
+                self._replace_file(os.path.join(cache_path, hashes_name), write_hashes)
+                manifest.setdefault('row_hashes', {})[table_name] = hashes_name
+            
+            def write_manifest(path):
+                with open(path, 'w') as f:
+                    json.dump(manifest, f, indent=2)
+            
+            self._replace_file(os.path.join(cache_path, 'manifest.json'), write_manifest)
+        except Exception as e:
+            print(f"Could not write data cache: {str(e)}")
+    
+    def _write_table_file(self, cache_path, table_name, df):
+        """Write one table as Parquet, falling back to pickle for mixed-type columns"""
+        parquet_name = f'{table_name}.parquet'
+        try:
+            self._replace_file(os.path.join(cache_path, parquet_name), df.to_parquet)
+            return parquet_name
+        except Exception:
+            # Excel columns mixing numbers and text (e.g. ZIP+4 codes) cannot be typed by Arrow
+            pickle_name = f'{table_name}.pkl'
+            self._replace_file(os.path.join(cache_path, pickle_name), df.to_pickle)
+            return pickle_name
+    
+    def _replace_file(self, path, write):
+        """Write through a temporary file so readers never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
     def _create_date_table(self):
         """Create a date table for time intelligence"""
         # Get date range from completed services
@@ -295,6 +1009,7 @@ class DataLoader:
                 date_df = pd.DataFrame({'Date': date_range})
                 
                 # Add date attributes
+                date_df['Date Key'] = (date_df['Date'].dt.year * 10000 + date_df['Date'].dt.month * 100 + date_df['Date'].dt.day).astype('int32')
                 date_df['Year'] = date_df['Date'].dt.year
                 date_df['Quarter'] = date_df['Date'].dt.quarter
                 date_df['Month'] = date_df['Date'].dt.month
@@ -306,10 +1021,20 @@ class DataLoader:
                 self.data['date_table'] = date_df
     
     def get_data(self, table_name):
-        """Get specific data table"""
+        """Get specific data table, loading it on first access"""
+        if table_name in self.TABLES and table_name not in self._loaded:
+            self.prefetch([table_name])
         return self.data.get(table_name, pd.DataFrame())
     
     def get_all_data(self):
         """Get all loaded data"""
         return self.data
 
+
+def _load_sheet_from_bytes(file_path, content, table_name, streaming=False, chunk_size=50000):
+    """Process-pool worker: parse and clean one sheet from in-memory workbook bytes"""
+    loader = DataLoader(file_path, use_cache=False, streaming=streaming, chunk_size=chunk_size)
+    with pd.ExcelFile(io.BytesIO(content)) as workbook:
+        loader._workbook = workbook
+        table = getattr(loader, DataLoader.SHEET_LOADERS[table_name])()
+    return table, loader.row_hashes.get(table_name)
@@ -0,0 +1,88 @@
+"""
+Data Store Module
+Process-wide, read-only dataset shared by every dashboard session
+"""
+
+import threading
+from datetime import datetime
+
+from src.data_loader import DataLoader
+from src.exporter import Exporter
+from src.filter_catalog import build_filter_catalog
+from src.kpi_calculator import KPICalculator
+from src.search_index import SearchIndex
+from src.table_pager import TablePager
+
+
+class Dataset:
+    """Read-only snapshot of one data version"""
+    
+    def __init__(self, data_loader, kpi_calculator, version):
+        self.data_loader = data_loader
+        self.kpi_calculator = kpi_calculator
+        # Row-level views of the loader's tables for browsing, search and export
+        self.table_pager = TablePager(data_loader)
+        self.search_index = SearchIndex(data_loader)
+        self.exporter = Exporter(data_loader)
+        self.version = version
+        self.loaded_at = datetime.now()
+        self._filter_catalog = None
+        self._lock = threading.Lock()
+    
+    def filter_catalog(self):
+        """Filter options of this version, built on first use and shared by every session; do not modify"""
+        with self._lock:
+            if self._filter_catalog is None:
+                self._filter_catalog = build_filter_catalog(self.data_loader)
+            return self._filter_catalog
+
+
+class DataStore:
+    """Holds the current Dataset; reloads build a new one and swap it in atomically"""
+    
+    def __init__(self, file_path, distinct_error=None):
+        self.file_path = file_path
+        # Passed to KPICalculator; set it to count distinct customers approximately
+        self.distinct_error = distinct_error
+        self._current = None
+        self._lock = threading.Lock()
+    
+    @property
+    def current(self):
+        """Current dataset, or None before the first load"""
+        return self._current
+    
+    def load(self):
+        """Load the dataset once per process; concurrent callers share the same load"""
+        with self._lock:
+            if self._current is None:
+                self._current = self._build()
+            return self._current
+    
+    def reload(self, force=False):
+        """Swap in a new dataset if the workbook changed (or always, with force)"""
+        with self._lock:
+            if force or self._current is None:
+                dataset = self._build()
+            else:
+                dataset = self._refresh(self._current)
+            if force or self._current is None or dataset.version != self._current.version:
+                # Sessions rendering the old snapshot finish with it; new reruns see this one
+                self._current = dataset
+            return self._current
+    
+    def _build(self):
+        """Create a loader and calculator for the workbook as it is on disk now"""
+        data_loader = DataLoader(self.file_path)
+        # Fingerprinting fixes the data version; sheets are parsed lazily per page
+        data_loader.prefetch([])
+        return Dataset(data_loader, KPICalculator(data_loader, distinct_error=self.distinct_error), data_loader.data_version)
+    
+    def _refresh(self, dataset):
+        """Next dataset built from the current one; appended rows are cleaned and aggregated on their own"""
+        data_loader = dataset.data_loader.refresh()
+        if data_loader is dataset.data_loader:
+            return dataset
+        kpi_calculator = KPICalculator(data_loader, distinct_error=self.distinct_error)
+        kpi_calculator.extend(dataset.kpi_calculator)
+        return Dataset(data_loader, kpi_calculator, data_loader.data_version)
@@ -0,0 +1,160 @@
+"""
+Date Index Module
+Daily prefix sums of the KPI measures for date-range queries
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.filter_engine import FilterEngine
+
+
+class DateIndex:
+    """Cumulative daily sums per (measure, dimension member) on a day axis aligned to the date table"""
+
+    # Filters answered from a member's own prefix sums; month is folded into the date range
+    DIMENSIONS = ['branch', 'sales_rep', 'technician', 'category']
+
+    def __init__(self, kpi_cube):
+        self.kpi_cube = kpi_cube
+        self.data_loader = kpi_cube.data_loader
+        self.data_version = None
+        self._axes = {}
+        self._prefix_sums = {}
+        self._lock = threading.Lock()
+
+    def range_total(self, table_name, measure, filters):
+        """Sum of a measure over the filters' date range, or None if the index cannot answer the query"""
+        axis = self._get_axis(table_name)
+        if axis is None or measure not in axis['measures'].columns:
+            return None
+
+        df = self.data_loader.get_data(table_name)
+        members = []
+        for filter_name in self.DIMENSIONS:
+            value = filters.get(filter_name) if filters else None
+            if value is None:
+                continue
+            column = next((col for col in FilterEngine.FILTER_COLUMNS[filter_name] if col in df.columns), None)
+            if column is not None:
+                members.append((filter_name, value))
+        # Several dimension filters need a joint index; leave those to the cube
+        if len(members) > 1:
+            return None
+
+        start, end = self._day_range(axis, filters)
+        if start > end:
+            return 0.0
+
+        filter_name, value = members[0] if members else (None, None)
+        values, prefix_sums = self._get_prefix_sums(table_name, measure, filter_name)
+        if filter_name is None:
+            row = 0
+        else:
+            try:
+                row = values.get_loc(value)
+            except (KeyError, TypeError):
+                return 0.0
+        return float(prefix_sums[row, end + 1] - prefix_sums[row, start])
+
+    def _day_range(self, axis, filters):
+        """First and last day offsets selected by the date range and month filters, clipped to the axis"""
+        start, end = 0, axis['days'] - 1
+        date_range = filters.get('date_range') if filters else None
+        if date_range is not None:
+            start = max(start, self._day(axis, date_range[0]))
+            end = min(end, self._day(axis, date_range[1]))
+        month = filters.get('month') if filters else None
+        if month is not None:
+            month = pd.Period(month, freq='M')
+            start = max(start, self._day(axis, month.start_time))
+            end = min(end, self._day(axis, month.end_time))
+        return start, end
+
+    def _day(self, axis, value):
+        """Day offset of a date on the axis"""
+        day = np.datetime64(pd.Timestamp(value).date(), 'D')
+        return int((day - axis['origin']).astype(np.int64))
+
+    def _get_axis(self, table_name):
+        """Day offsets and measures of a table's rows, built once per data version; None for undated tables"""
+        with self._lock:
+            if self.data_version != self.data_loader.data_version:
+                self._axes = {}
+                self._prefix_sums = {}
+                self.data_version = self.data_loader.data_version
+            if table_name not in self._axes:
+                self._axes[table_name] = self._build_axis(table_name)
+            return self._axes[table_name]
+
+    def _build_axis(self, table_name):
+        """Map a table's rows onto a day axis spanning the date table and the table's own dates"""
+        df = self.data_loader.get_data(table_name)
+        date_columns = [col for col, prefix in DataLoader.DATE_COLUMNS.get(table_name, []) if prefix == '']
+        if not date_columns or date_columns[0] not in df.columns or 'Date Key' not in df.columns:
+            return None
+
+        dates = df[date_columns[0]].to_numpy(dtype='datetime64[D]')
+        dated = ~np.isnat(dates)
+        bounds = []
+        if dated.any():
+            bounds += [dates[dated].min(), dates[dated].max()]
+        date_table = self.data_loader.get_data('date_table')
+        if 'Date' in date_table.columns and len(date_table) > 0:
+            bounds += [np.datetime64(date_table['Date'].iloc[0], 'D'), np.datetime64(date_table['Date'].iloc[-1], 'D')]
+        if not bounds:
+            return None
+
+        origin = min(bounds)
+        days = int((max(bounds) - origin).astype(np.int64)) + 1
+        offsets = np.where(dated, (dates - origin).astype(np.int64), -1)
+        return {
+            'origin': origin,
+            'days': days,
+            'offsets': offsets,
+            'measures': self.kpi_cube.measures(table_name)
+        }
+
+    def _get_prefix_sums(self, table_name, measure, filter_name):
+        """(members, cumulative daily sums with a leading zero column) for a measure, built on first use"""
+        key = (table_name, measure, filter_name)
+        axis = self._get_axis(table_name)
+        with self._lock:
+            if key in self._prefix_sums:
+                return self._prefix_sums[key]
+        result = self._build_prefix_sums(table_name, axis, measure, filter_name)
+        with self._lock:
+            if self.data_version == self.data_loader.data_version:
+                self._prefix_sums[key] = result
+        return result
+
+    def _build_prefix_sums(self, table_name, axis, measure, filter_name):
+        """One row of daily sums per dimension member (a single row when unfiltered), accumulated over days"""
+        days = axis['days']
+        offsets = axis['offsets']
+        weights = axis['measures'][measure].to_numpy(dtype=np.float64, na_value=0.0)
+
+        if filter_name is None:
+            values = pd.Index([None])
+            codes = np.zeros(len(offsets), dtype=np.int64)
+        else:
+            df = self.data_loader.get_data(table_name)
+            column = next(col for col in FilterEngine.FILTER_COLUMNS[filter_name] if col in df.columns)
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy().astype(np.int64)
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+                values = pd.Index(values)
+
+        # Undated rows and missing members fall outside every range
+        keep = (offsets >= 0) & (codes >= 0)
+        cells = codes[keep] * days + offsets[keep]
+        daily = np.bincount(cells, weights=weights[keep], minlength=len(values) * days).reshape(len(values), days)
+        prefix_sums = np.zeros((len(values), days + 1))
+        np.cumsum(daily, axis=1, out=prefix_sums[:, 1:])
+        return values, prefix_sums
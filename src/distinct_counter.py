@@ -0,0 +1,138 @@
+"""
+Distinct Counter Module
+Approximate distinct counts over filtered slices from precomputed HyperLogLog sketches
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.filter_engine import FilterEngine
+from src.hll import DEFAULT_ERROR, estimate, grouped_registers, precision_for_error, register_updates
+
+
+class DistinctCounter:
+    """Distinct values of a column for any filter slice, merged from per-member and per-row sketches"""
+
+    # Row subsets that can be counted on their own -> method returning the row mask
+    POPULATIONS = {
+        'auto_pay': '_auto_pay_rows'
+    }
+
+    def __init__(self, kpi_calculator, error=DEFAULT_ERROR):
+        self.kpi_calculator = kpi_calculator
+        self.data_loader = kpi_calculator.data_loader
+        self.error = error
+        self.precision = precision_for_error(error)
+        self.data_version = None
+        self._sketches = {}
+        self._lock = threading.Lock()
+
+    def count(self, table_name, column, filters=None, dimensions=None, population=None):
+        """Estimated distinct values of a column over the filtered rows"""
+        sketches = self._get_sketches(table_name, column, population)
+        active = self._active_filters(sketches, filters, dimensions)
+
+        if not active:
+            registers = sketches['total']
+        elif len(active) == 1 and active[0] in sketches['members']:
+            # A single member's sketch answers the slice directly
+            values, member_registers = sketches['members'][active[0]]
+            try:
+                registers = member_registers[values.get_loc(filters[active[0]])]
+            except (KeyError, TypeError):
+                return 0
+        else:
+            rows = self._rows(table_name, sketches, filters, dimensions)
+            registers = grouped_registers(np.zeros(len(rows), dtype=np.int64), 1,
+                                          sketches['index'][rows], sketches['rank'][rows], self.precision)
+        return int(round(estimate(registers)[0]))
+
+    def count_by(self, table_name, column, by, filters=None, dimensions=None, population=None):
+        """Estimated distinct values per member of the `by` filter dimension, for members with rows"""
+        sketches = self._get_sketches(table_name, column, population)
+        if by not in sketches['members']:
+            raise ValueError(f"{table_name} has no {by} dimension")
+        values, member_registers = sketches['members'][by]
+
+        if self._active_filters(sketches, filters, dimensions):
+            rows = self._rows(table_name, sketches, filters, dimensions)
+            member_registers = grouped_registers(sketches['codes'][by][rows], len(values),
+                                                 sketches['index'][rows], sketches['rank'][rows], self.precision)
+        # Members without any row keep all-zero registers
+        observed = member_registers.any(axis=1)
+        counts = np.round(estimate(member_registers[observed])).astype(np.int64)
+        return pd.Series(counts, index=pd.Index(values[observed], name=values.name), name=column)
+
+    def _active_filters(self, sketches, filters, dimensions):
+        """Names of the set filters that apply to the table"""
+        if not filters:
+            return []
+        return [
+            name for name, value in filters.items()
+            if value is not None and name in sketches['filters'] and (dimensions is None or name in dimensions)
+        ]
+
+    def _rows(self, table_name, sketches, filters, dimensions):
+        """Positions of the filtered rows"""
+        rows = self.kpi_calculator.filter_engine.row_indexer(table_name, filters, dimensions)
+        return np.arange(len(sketches['index'])) if rows is None else rows
+
+    def _get_sketches(self, table_name, column, population):
+        """Sketches of one column and population, built once per data version"""
+        key = (table_name, column, population)
+        with self._lock:
+            if self.data_version != self.data_loader.data_version:
+                self._sketches = {}
+                self.data_version = self.data_loader.data_version
+            if key in self._sketches:
+                return self._sketches[key]
+        sketches = self._build(table_name, column, population)
+        with self._lock:
+            self._sketches[key] = sketches
+        return sketches
+
+    def _build(self, table_name, column, population):
+        """Hash every row once into (register, rank) updates, and merge them per dimension member"""
+        df = self.data_loader.get_data(table_name)
+        if column not in df.columns:
+            raise ValueError(f"{table_name} has no {column} column")
+        values = df[column]
+        index, rank = register_updates(pd.util.hash_array(values.to_numpy()), self.precision)
+        # Rank 0 never raises a register, so excluded rows drop out of every merge
+        counted = values.notna().to_numpy()
+        if population is not None:
+            counted &= getattr(self, self.POPULATIONS[population])(df)
+        rank = np.where(counted, rank, 0).astype(np.uint8)
+
+        sketches = {
+            'index': index,
+            'rank': rank,
+            'total': grouped_registers(np.zeros(len(df), dtype=np.int64), 1, index, rank, self.precision)[0],
+            'members': {},
+            'codes': {},
+            'filters': [name for name, key_column in FilterEngine.RANGE_COLUMNS.items() if key_column in df.columns]
+        }
+        for filter_name, columns in FilterEngine.FILTER_COLUMNS.items():
+            member_column = next((col for col in columns if col in df.columns), None)
+            if member_column is None:
+                continue
+            series = df[member_column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                members = series.cat.categories
+            else:
+                codes, members = pd.factorize(series)
+                members = pd.Index(members)
+            members = members.rename(member_column)
+            sketches['members'][filter_name] = (members, grouped_registers(codes, len(members), index, rank, self.precision))
+            sketches['codes'][filter_name] = codes
+            sketches['filters'].append(filter_name)
+        return sketches
+
+    def _auto_pay_rows(self, df):
+        """Rows whose customer is enrolled in auto pay"""
+        if 'Customer Id' not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        return self.kpi_calculator.auto_pay_counts(df['Customer Id']) > 0
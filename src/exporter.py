@@ -0,0 +1,161 @@
+"""
+Exporter Module
+Chunked table exports to CSV, Parquet and Excel, for downloads and scheduled extracts
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from src.data_loader import DataLoader
+from src.filter_engine import FilterEngine
+
+
+class Exporter:
+    """Writes a table's rows to a file chunk by chunk, so only one chunk is converted in memory at a time"""
+
+    # Format -> (MIME type, file extension)
+    FORMATS = {
+        'csv': ('text/csv', '.csv'),
+        'parquet': ('application/vnd.apache.parquet', '.parquet'),
+        'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx')
+    }
+
+    # Rows per sheet allowed by Excel, including the header
+    XLSX_MAX_ROWS = 1048576
+
+    # Exports up to this size stay in memory; larger ones spill to a temporary file
+    SPOOL_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, data_loader, chunk_rows=50000):
+        self.data_loader = data_loader
+        self.chunk_rows = chunk_rows
+
+    def export(self, table_name, file_format, rows=None, columns=None, file=None):
+        """Write the rows (positions, all when None) and columns of a table; returns the file, rewound if it was spooled here"""
+        if file_format not in self.FORMATS:
+            raise ValueError(f"Unknown export format: {file_format}")
+        df = self.data_loader.get_data(table_name)
+        columns = df.columns if columns is None else pd.Index(columns)
+        rows = np.arange(len(df)) if rows is None else np.asarray(rows)
+
+        spooled = file is None
+        if spooled:
+            file = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE)
+        getattr(self, f'_write_{file_format}')(df, rows, columns, file)
+        if spooled:
+            file.seek(0)
+        return file
+
+    def _chunks(self, df, rows, columns):
+        """Row chunks of the export, taken one at a time and projected to the columns"""
+        for start in range(0, max(len(rows), 1), self.chunk_rows):
+            yield df.take(rows[start:start + self.chunk_rows])[columns]
+
+    def _write_csv(self, df, rows, columns, file):
+        """CSV with a header row"""
+        for i, chunk in enumerate(self._chunks(df, rows, columns)):
+            file.write(chunk.to_csv(index=False, header=i == 0).encode('utf-8'))
+
+    def _write_parquet(self, df, rows, columns, file):
+        """Parquet with one row group per chunk"""
+        # Excel columns mixing numbers and text (e.g. ZIP+4 codes) cannot be typed by Arrow; write them as text
+        mixed = [col for col in columns if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed')]
+        schema = None
+        writer = None
+        for chunk in self._chunks(df, rows, columns):
+            for col in mixed:
+                chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str))
+            if schema is None:
+                schema = self._parquet_schema(df, rows, chunk, mixed)
+                writer = pq.ParquetWriter(file, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        writer.close()
+
+    def _parquet_schema(self, df, rows, first_chunk, mixed):
+        """Schema of the first chunk, with columns that are empty there typed from their first value in the export"""
+        schema = pa.Schema.from_pandas(first_chunk, preserve_index=False)
+        for i, field in enumerate(schema):
+            if not pa.types.is_null(field.type):
+                continue
+            if field.name in mixed:
+                schema = schema.set(i, field.with_type(pa.string()))
+                continue
+            values = df[field.name].take(rows).dropna()
+            if len(values) > 0:
+                schema = schema.set(i, field.with_type(pa.array(values.iloc[:1]).type))
+        return schema
+
+    def _write_xlsx(self, df, rows, columns, file):
+        """Single-sheet workbook streamed row by row"""
+        if len(rows) + 1 > self.XLSX_MAX_ROWS:
+            raise ValueError(f"{len(rows)} rows exceed the Excel limit of {self.XLSX_MAX_ROWS - 1}; export CSV or Parquet instead")
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append([str(col) for col in columns])
+        for chunk in self._chunks(df, rows, columns):
+            for row in self._excel_values(chunk).itertuples(index=False, name=None):
+                sheet.append(row)
+        workbook.save(file)
+
+    def _excel_values(self, chunk):
+        """Chunk as Python objects Excel cells accept: periods as text, missing values empty"""
+        chunk = chunk.copy()
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, pd.PeriodDtype):
+                chunk[col] = chunk[col].astype(str)
+        chunk = chunk.astype(object)
+        return chunk.where(chunk.notna(), None)
+
+
+def main(argv=None):
+    """Command line: export one table of the workbook, optionally filtered, e.g. for a scheduled extract"""
+    parser = argparse.ArgumentParser(prog='python -m src.exporter', description="Export a dashboard table")
+    parser.add_argument('table', choices=DataLoader.TABLES)
+    parser.add_argument('output', help="Output file; the format follows the extension unless --format is given")
+    parser.add_argument('--workbook', default='data/FLPP_All_Data_Merged.xlsx')
+    parser.add_argument('--format', choices=list(Exporter.FORMATS), dest='file_format')
+    parser.add_argument('--columns', nargs='+', help="Columns to export, in order (default: all)")
+    parser.add_argument('--chunk-rows', type=int, default=50000)
+    for filter_name in FilterEngine.FILTER_COLUMNS:
+        parser.add_argument(f"--{filter_name.replace('_', '-')}", dest=filter_name, help=f"Only rows with this {filter_name.replace('_', ' ')}")
+    parser.add_argument('--start', help="First date (YYYY-MM-DD) of the date range")
+    parser.add_argument('--end', help="Last date (YYYY-MM-DD) of the date range")
+    args = parser.parse_args(argv)
+
+    file_format = args.file_format
+    if file_format is None:
+        extension = os.path.splitext(args.output)[1].lower()
+        file_format = next((name for name, (_, ext) in Exporter.FORMATS.items() if ext == extension), None)
+        if file_format is None:
+            parser.error(f"Cannot tell the format of {args.output}; use --format")
+
+    data_loader = DataLoader(args.workbook)
+    df = data_loader.get_data(args.table)
+    if args.columns:
+        missing = [col for col in args.columns if col not in df.columns]
+        if missing:
+            parser.error(f"{args.table} has no column(s): {', '.join(missing)}")
+
+    filters = {name: getattr(args, name) for name in FilterEngine.FILTER_COLUMNS}
+    if args.start or args.end:
+        start = pd.Timestamp(args.start) if args.start else pd.Timestamp.min
+        end = pd.Timestamp(args.end) if args.end else pd.Timestamp.max
+        filters['date_range'] = (start.date(), end.date())
+    rows = FilterEngine(data_loader).row_indexer(args.table, filters)
+
+    with open(args.output, 'wb') as file:
+        Exporter(data_loader, args.chunk_rows).export(args.table, file_format, rows, args.columns, file)
+    print(f"Exported {len(df) if rows is None else len(rows)} rows of {args.table} to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Filter Catalog Module
+Options offered by the dashboard filters, read from the loaded tables
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Tables scanned for the filter options
+FILTER_TABLES = ['completed_services', 'sales_by_tech', 'lost_sales', 'customer_detail']
+
+
+def build_filter_catalog(data_loader):
+    """Filter options of a loader's data: dimension values and the date range bounds"""
+    filters = {}
+    
+    # Branch filter
+    branches = set()
+    for table_name in ['completed_services', 'sales_by_tech', 'customer_detail']:
+        branches.update(_distinct_values(data_loader.get_data(table_name), 'Branch'))
+    filters['branches'] = sorted(branches)
+    
+    # Sales Rep filter
+    sales_reps = set(_distinct_values(data_loader.get_data('sales_by_tech'), 'Primary Sales Rep'))
+    sales_reps.update(_distinct_values(data_loader.get_data('lost_sales'), 'Sales Rep'))
+    filters['sales_reps'] = sorted(sales_reps)
+    
+    # Technician filter
+    filters['technicians'] = sorted(_distinct_values(data_loader.get_data('completed_services'), 'Tech Name'))
+    
+    # Category filter
+    categories = set()
+    for table_name in ['completed_services', 'sales_by_tech']:
+        categories.update(_distinct_values(data_loader.get_data(table_name), 'Category'))
+    filters['categories'] = sorted(categories)
+    
+    # Month filter
+    try:
+        filters['months'] = sorted(_distinct_values(data_loader.get_data('completed_services'), 'Year Month'))
+    except Exception:
+        filters['months'] = []
+    
+    # Date range bounds (first and last dated row of the filtered tables)
+    date_keys = []
+    for table_name in FILTER_TABLES:
+        df = data_loader.get_data(table_name)
+        if 'Date Key' in df.columns and df['Date Key'].notna().any():
+            date_keys.extend([df['Date Key'].min(), df['Date Key'].max()])
+    if date_keys:
+        filters['date_bounds'] = tuple(pd.to_datetime(str(int(key)), format='%Y%m%d').date() for key in (min(date_keys), max(date_keys)))
+    else:
+        filters['date_bounds'] = None
+    
+    return filters
+
+
+def _distinct_values(df, column):
+    """Distinct non-missing values of a column; categoricals are read from their codes, without copying the column"""
+    if column not in df.columns:
+        return []
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        present = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)) > 0
+        return series.cat.categories[present].tolist()
+    return [value for value in pd.unique(series.to_numpy()) if not pd.isna(value)]
@@ -0,0 +1,144 @@
+"""
+Filter Engine Module
+Precomputed row indexes for the dashboard filters
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class FilterEngine:
+    """Answers filter queries by intersecting per-dimension row-position indexes"""
+
+    # Filter name -> candidate columns; the first one present in a table is used
+    FILTER_COLUMNS = {
+        'branch': ['Branch'],
+        'sales_rep': ['Primary Sales Rep', 'Sales Rep'],
+        'technician': ['Tech Name'],
+        'category': ['Category'],
+        'month': ['Year Month']
+    }
+
+    # Range filter -> the day key it is matched against; a (start, end) pair of dates, both inclusive
+    RANGE_COLUMNS = {
+        'date_range': 'Date Key'
+    }
+
+    def __init__(self, data_loader):
+        self.data_loader = data_loader
+        self._indexes = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def filter_key(filters):
+        """Hashable form of a filters dict; unset (None/All) filters are dropped"""
+        if not filters:
+            return ()
+        return tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+
+    @staticmethod
+    def date_key(value):
+        """YYYYMMDD key of a date, the same key as the Date Key columns"""
+        value = pd.Timestamp(value)
+        return value.year * 10000 + value.month * 100 + value.day
+
+    @staticmethod
+    def within(filters, start, end):
+        """Copy of the filters with the date range narrowed to [start, end]"""
+        filters = dict(filters or {})
+        date_range = filters.get('date_range')
+        if date_range is not None:
+            start = max(pd.Timestamp(start), pd.Timestamp(date_range[0])).date()
+            end = min(pd.Timestamp(end), pd.Timestamp(date_range[1])).date()
+        filters['date_range'] = (start, end)
+        return filters
+
+    def filter(self, table_name, filters, dimensions=None):
+        """Filtered rows of a table; the shared frame itself when no filter applies"""
+        df = self.data_loader.get_data(table_name)
+        positions = self.row_indexer(table_name, filters, dimensions)
+        if positions is None:
+            return df
+        return df.take(positions)
+
+    def row_indexer(self, table_name, filters, dimensions=None):
+        """Sorted row positions matching all filters, or None when nothing filters the table"""
+        if not filters:
+            return None
+        index = self._get_index(table_name)
+
+        matches = []
+        for filter_name, value in filters.items():
+            if not value or filter_name not in index:
+                continue
+            if dimensions is not None and filter_name not in dimensions:
+                continue
+            if filter_name in self.RANGE_COLUMNS:
+                matches.append(self._range_positions(index[filter_name], value))
+                continue
+            values, order, offsets = index[filter_name]
+            try:
+                code = values.get_loc(value)
+            except (KeyError, TypeError):
+                return np.empty(0, dtype=np.intp)
+            # Positions within one value are ascending, so every match list is sorted
+            matches.append(order[offsets[code]:offsets[code + 1]])
+
+        if not matches:
+            return None
+        matches.sort(key=len)
+        positions = matches[0]
+        for other in matches[1:]:
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
+
+    def _range_positions(self, range_index, date_range):
+        """Sorted row positions whose day key lies within a (start, end) date range"""
+        keys, order = range_index
+        start = np.searchsorted(keys, self.date_key(date_range[0]), side='left')
+        end = np.searchsorted(keys, self.date_key(date_range[1]), side='right')
+        return np.sort(order[start:end])
+
+    def _get_index(self, table_name):
+        """Per-filter indexes for a table, built on first use for each data version"""
+        df = self.data_loader.get_data(table_name)
+        with self._lock:
+            if self._version != self.data_loader.data_version:
+                self._indexes = {}
+                self._version = self.data_loader.data_version
+            if table_name not in self._indexes:
+                self._indexes[table_name] = self._build_index(df)
+            return self._indexes[table_name]
+
+    def _build_index(self, df):
+        """Map each filter to (values, row order grouped by value, group offsets), or range filters to (sorted keys, row order)"""
+        index = {}
+        for filter_name, columns in self.FILTER_COLUMNS.items():
+            column = next((col for col in columns if col in df.columns), None)
+            if column is None:
+                continue
+
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+                values = pd.Index(values)
+
+            # Missing values (code -1) sort first and are never matched
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            offsets = np.concatenate([[0], np.cumsum(counts)]) + (codes < 0).sum()
+            index[filter_name] = (values, order, offsets)
+
+        # Range filters keep rows in key order; missing keys (NaN) sort last and are never matched
+        for filter_name, column in self.RANGE_COLUMNS.items():
+            if column in df.columns:
+                keys = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                order = np.argsort(keys, kind='stable')
+                index[filter_name] = (keys[order], order)
+        return index
@@ -0,0 +1,56 @@
+"""
+HyperLogLog Module
+Register updates and estimates of HyperLogLog sketches, for approximate distinct counts
+"""
+
+import numpy as np
+
+
+# Relative standard error used when none is configured
+DEFAULT_ERROR = 0.02
+
+
+def precision_for_error(error):
+    """Smallest precision whose standard error (1.04 / sqrt(2**precision)) is within the given bound"""
+    precision = int(np.ceil(2 * np.log2(1.04 / error)))
+    return min(max(precision, 4), 18)
+
+
+def register_updates(hashes, precision):
+    """(register index, rank) of each hash: the top bits pick the register, the rest give the rank"""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    width = 64 - precision
+    index = (hashes >> np.uint64(width)).astype(np.int64)
+    rest = hashes & np.uint64((1 << width) - 1)
+    # Bit length in two 32-bit halves, which convert to float exactly
+    high = (rest >> np.uint64(32)).astype(np.float64)
+    low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    bit_length = np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+    rank = (width + 1 - bit_length).astype(np.uint8)
+    return index, rank
+
+
+def grouped_registers(codes, n_groups, index, rank, precision):
+    """One row of registers per group code; negative codes are skipped"""
+    size = 1 << precision
+    keep = codes >= 0
+    registers = np.zeros(n_groups * size, dtype=np.uint8)
+    np.maximum.at(registers, codes[keep].astype(np.int64) * size + index[keep], rank[keep])
+    return registers.reshape(n_groups, size)
+
+
+def estimate(registers):
+    """Distinct-count estimate of each row of registers"""
+    registers = np.atleast_2d(registers)
+    size = registers.shape[1]
+    if size >= 128:
+        alpha = 0.7213 / (1 + 1.079 / size)
+    else:
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}[size]
+    raw = alpha * size * size / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+    # Linear counting is more accurate while many registers are still empty
+    zeros = (registers == 0).sum(axis=1)
+    with np.errstate(divide='ignore'):
+        linear = size * np.log(size / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * size) & (zeros > 0), linear, raw)
+
@@ -5,7 +5,30 @@ Calculates all KPIs from the loaded data
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from src.distinct_counter import DistinctCounter
+from src.filter_engine import FilterEngine
+from src.kpi_cube import KPICube
+from src.trend_engine import TrendEngine
+
+
+# KPIs measured against the current calendar year; their cached values expire when it changes
+YEAR_DEPENDENT_KPIS = {'total_ytd_revenue', 'organic_growth_yoy'}
+
+
+def cached_kpi(method):
+    """Memoize a KPI method on (KPI name, normalized filters, data version), plus the year for YEAR_DEPENDENT_KPIS"""
+    @functools.wraps(method)
+    def wrapper(self, filters=None):
+        key = (method.__name__, FilterEngine.filter_key(filters), self.data_loader.data_version)
+        if method.__name__ in YEAR_DEPENDENT_KPIS:
+            key += (datetime.now().year,)
+        return self._cached(key, lambda: method(self, filters))
+    return wrapper
 
 
 class KPICalculator:
@@ -31,9 +54,38 @@ class KPICalculator:
         'avg_monthly_production_per_tech': 15000
     }
     
-    def __init__(self, data_loader):
+    # Dashboard section -> KPIs shown on its scorecard
+    SECTIONS = {
+        'sales_growth': ['monthly_sales_per_rep', 'recurring_sales_pct', 'organic_growth_yoy', 'cancellation_rate'],
+        'technician_performance': ['completion_rate', 'tech_review_score', 'recurring_service_ratio', 'service_accuracy'],
+        'financial_metrics': ['payroll_pct_revenue', 'chemical_spend_pct', 'ebitda_margin', 'revenue_growth_yoy'],
+        'customer_payment': ['auto_pay_enrollment', 'avg_customer_review'],
+        'fleet_safety': ['total_ytd_revenue', 'avg_monthly_production_per_tech']
+    }
+    
+    # Per-entity KPI -> (table, entity column, monthly measure) for leaderboards
+    LEADERBOARDS = {
+        'monthly_sales_per_rep': ('sales_by_tech', 'Primary Sales Rep', 'Contract Value'),
+        'avg_monthly_production_per_tech': ('completed_services', 'Tech Name', 'Invoice Amount')
+    }
+    
+    def __init__(self, data_loader, cache_size=256, distinct_error=None):
         self.data_loader = data_loader
-        self.data = data_loader.get_all_data()
+        self.filter_engine = FilterEngine(data_loader)
+        self.kpi_cube = KPICube(data_loader)
+        self.trend_engine = TrendEngine(self)
+        # Approximate distinct customer counts within distinct_error (relative); exact when None
+        self.distinct_counter = DistinctCounter(self, distinct_error) if distinct_error else None
+        
+        # LRU cache of KPI results, see cached_kpi
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # (data version, sorted Customer Ids, Auto Pay rows per id), see auto_pay_counts
+        self._auto_pay_lookup = None
     
     def get_status(self, value, target, reverse=False):
         """Get traffic light status (Green/Yellow/Red)"""
@@ -57,55 +109,102 @@ class KPICalculator:
             else:
                 return "Red", pct_to_target
     
+    def get_statuses(self, values, targets, reverse=False):
+        """Vectorized get_status: status and pct-to-target arrays for arrays of values, targets and reverse flags"""
+        values = self._as_float_array(values)
+        targets = np.broadcast_to(self._as_float_array(targets), values.shape)
+        reverse = np.broadcast_to(np.asarray(reverse, dtype=bool), values.shape)
+        
+        gray = np.isnan(values) | np.isnan(targets) | (targets == 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_to_target = np.where(reverse, targets / values, values / targets)
+        
+        # Same thresholds as get_status; lower is better where reverse is set
+        green = np.where(reverse, pct_to_target <= 1.0, pct_to_target >= 1.0)
+        yellow = np.where(reverse, pct_to_target <= 1.1, pct_to_target >= 0.90)
+        statuses = np.select([gray, green, yellow], ["Gray", "Green", "Yellow"], default="Red")
+        
+        return statuses, np.where(gray, 0.0, pct_to_target)
+    
+    def _as_float_array(self, values):
+        """Float ndarray of values, with pandas NA as NaN"""
+        if isinstance(values, (pd.Series, pd.Index)):
+            return values.to_numpy(dtype=float, na_value=np.nan)
+        return np.asarray(values, dtype=float)
+    
+    # ============================================================================
+    # BATCH SCORECARD
+    # ============================================================================
+    
+    def compute_all(self, filters=None):
+        """Card tuples (value, target, status, pct) for every KPI, keyed by KPI name"""
+        cards = {}
+        for section in self.SECTIONS:
+            cards.update(self.compute_section(section, filters))
+        return cards
+    
+    def compute_section(self, section, filters=None):
+        """Card tuples for one dashboard section, keyed by KPI name"""
+        # KPIs of a batch share the cube's filtered slices and rollups (see KPICube.cells)
+        return {name: getattr(self, name)(filters) for name in self.SECTIONS[section]}
+    
+    def leaderboard(self, kpi_name, filters=None):
+        """Per-entity values of a KPI with targets and statuses, best first"""
+        table_name, entity, measure = self.LEADERBOARDS[kpi_name]
+        columns = [entity, measure, 'Target', 'Status', 'Pct to Target']
+        if measure not in self.data_loader.get_data(table_name).columns or not self.kpi_cube.has_dimensions(table_name, [entity, 'Year Month']):
+            return pd.DataFrame(columns=columns)
+        
+        # Same per-entity monthly means as the scorecard KPI
+        board = self.kpi_cube.entity_monthly_means(table_name, entity, measure, filters).reset_index()
+        board['Target'] = self.TARGETS[kpi_name]
+        board['Status'], board['Pct to Target'] = self.get_statuses(board[measure], board['Target'])
+        
+        return board.sort_values(measure, ascending=False)[columns]
+    
+    def kpi_trend(self, name, filters=None, freq='M'):
+        """KPI series over months ('M'), quarters ('Q') or weeks ('W'); the frame is shared, do not modify it"""
+        key = ('trend', name, freq, FilterEngine.filter_key(filters), self.data_loader.data_version)
+        return self._cached(key, lambda: self.trend_engine.trend(name, filters, freq))
+    
     # ============================================================================
     # SALES & GROWTH KPIs
     # ============================================================================
     
+    @cached_kpi
     def monthly_sales_per_rep(self, filters=None):
         """Calculate average monthly sales per rep"""
-        df = self.data.get('sales_by_tech', pd.DataFrame())
+        df = self.data_loader.get_data('sales_by_tech')
         if df.empty or 'Contract Value' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        if 'Sold Date' in df.columns:
-            df['Year Month'] = pd.to_datetime(df['Sold Date']).dt.to_period('M')
-            monthly_sales = df.groupby(['Primary Sales Rep', 'Year Month'])['Contract Value'].sum().reset_index()
-            monthly_avg = monthly_sales.groupby('Primary Sales Rep')['Contract Value'].mean().mean()
+        if self.kpi_cube.has_dimensions('sales_by_tech', ['Primary Sales Rep', 'Year Month']):
+            monthly_avg = self.kpi_cube.entity_monthly_means('sales_by_tech', 'Primary Sales Rep', 'Contract Value', filters).mean()
         else:
             # Fallback if no date
-            if 'Primary Sales Rep' in df.columns:
-                monthly_avg = df.groupby('Primary Sales Rep')['Contract Value'].mean().mean()
+            if self.kpi_cube.has_dimensions('sales_by_tech', ['Primary Sales Rep']):
+                rep_sales = self.kpi_cube.rollup('sales_by_tech', 'Primary Sales Rep', filters)
+                monthly_avg = (rep_sales['Contract Value'] / rep_sales['Rows']).mean()
             else:
-                monthly_avg = df['Contract Value'].mean()
+                rows = self.kpi_cube.total('sales_by_tech', 'Rows', filters)
+                monthly_avg = self.kpi_cube.total('sales_by_tech', 'Contract Value', filters) / rows if rows > 0 else np.nan
         
         target = self.TARGETS['monthly_sales_per_rep']
         status, pct = self.get_status(monthly_avg, target)
         
         return monthly_avg, target, status, pct
     
+    @cached_kpi
     def recurring_sales_pct(self, filters=None):
         """Calculate percentage of recurring sales"""
-        df = self.data.get('sales_by_tech', pd.DataFrame())
+        df = self.data_loader.get_data('sales_by_tech')
         if df.empty or 'Contract Value' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        total_sales = df['Contract Value'].sum()
+        total_sales = self.kpi_cube.total('sales_by_tech', 'Contract Value', filters)
         
-        # Identify recurring sales (contains "Monthly", "Bi-Monthly", "Quarterly", "Recurring")
-        recurring_keywords = ['Monthly', 'Bi-Monthly', 'Quarterly', 'Recurring']
-        if 'Category' in df.columns:
-            recurring_mask = df['Category'].astype(str).str.contains('|'.join(recurring_keywords), case=False, na=False)
-            recurring_sales = df[recurring_mask]['Contract Value'].sum()
-        else:
-            recurring_sales = 0
+        # Recurring sales are flagged at load (see DataLoader.FLAG_COLUMNS)
+        recurring_sales = self.kpi_cube.total('sales_by_tech', 'Recurring Contract Value', filters)
         
         pct = recurring_sales / total_sales if total_sales > 0 else 0
         target = self.TARGETS['recurring_sales_pct']
@@ -113,22 +212,19 @@ class KPICalculator:
         
         return pct, target, status, pct_to_target
     
+    @cached_kpi
     def organic_growth_yoy(self, filters=None):
         """Calculate year-over-year organic growth"""
-        df = self.data.get('sales_by_tech', pd.DataFrame())
-        if df.empty or 'Contract Value' not in df.columns or 'Sold Date' not in df.columns:
+        df = self.data_loader.get_data('sales_by_tech')
+        if df.empty or 'Contract Value' not in df.columns or 'Year' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        df['Year'] = pd.to_datetime(df['Sold Date']).dt.year
         current_year = datetime.now().year
         previous_year = current_year - 1
         
-        current_year_sales = df[df['Year'] == current_year]['Contract Value'].sum()
-        previous_year_sales = df[df['Year'] == previous_year]['Contract Value'].sum()
+        # Each year is two prefix-sum lookups (see DateIndex)
+        current_year_sales = self.kpi_cube.total('sales_by_tech', 'Contract Value', self._year_filters(filters, current_year))
+        previous_year_sales = self.kpi_cube.total('sales_by_tech', 'Contract Value', self._year_filters(filters, previous_year))
         
         if previous_year_sales == 0:
             return 0, 0, "Gray", 0
@@ -139,21 +235,16 @@ class KPICalculator:
         
         return growth, target, status, pct_to_target
     
+    @cached_kpi
     def cancellation_rate(self, filters=None):
         """Calculate cancellation rate"""
-        sales_df = self.data.get('sales_by_tech', pd.DataFrame())
-        lost_df = self.data.get('lost_sales', pd.DataFrame())
+        sales_df = self.data_loader.get_data('sales_by_tech')
         
         if sales_df.empty:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            sales_df = self._apply_filters(sales_df, filters)
-            lost_df = self._apply_filters(lost_df, filters)
-        
-        total_sales = sales_df['Contract Value'].sum() if 'Contract Value' in sales_df.columns else 0
-        lost_sales = lost_df['Contract Value'].sum() if 'Contract Value' in lost_df.columns else 0
+        total_sales = self.kpi_cube.total('sales_by_tech', 'Contract Value', filters)
+        lost_sales = self.kpi_cube.total('lost_sales', 'Contract Value', filters)
         
         total_opportunities = total_sales + lost_sales
         rate = lost_sales / total_opportunities if total_opportunities > 0 else 0
@@ -167,18 +258,15 @@ class KPICalculator:
     # TECHNICIAN PERFORMANCE KPIs
     # ============================================================================
     
+    @cached_kpi
     def completion_rate(self, filters=None):
         """Calculate completion rate"""
-        df = self.data.get('completed_services', pd.DataFrame())
+        df = self.data_loader.get_data('completed_services')
         if df.empty:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
         # Assuming all rows are completed services
-        completed = len(df)
+        completed = self.kpi_cube.total('completed_services', 'Rows', filters)
         # If we had assigned services, we'd compare here
         assigned = completed  # Placeholder
         
@@ -188,49 +276,50 @@ class KPICalculator:
         
         return rate, target, status, pct_to_target
     
+    @cached_kpi
     def tech_review_score(self, filters=None):
         """Calculate average tech review score"""
-        df = self.data.get('tech_reviews', pd.DataFrame())
+        df = self.data_loader.get_data('tech_reviews')
         if df.empty or 'Average Star Rating' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
         # Weighted average by total ratings
         if 'Total Ratings' in df.columns:
-            df['Weighted Score'] = df['Average Star Rating'] * df['Total Ratings']
-            avg_score = df['Weighted Score'].sum() / df['Total Ratings'].sum() if df['Total Ratings'].sum() > 0 else 0
+            total_ratings = self.kpi_cube.total('tech_reviews', 'Total Ratings', filters)
+            avg_score = self.kpi_cube.total('tech_reviews', 'Weighted Rating Sum', filters) / total_ratings if total_ratings > 0 else 0
         else:
-            avg_score = df['Average Star Rating'].mean()
+            rating_count = self.kpi_cube.total('tech_reviews', 'Rating Count', filters)
+            avg_score = self.kpi_cube.total('tech_reviews', 'Rating Sum', filters) / rating_count if rating_count > 0 else np.nan
         
         target = self.TARGETS['tech_review_score']
         status, pct_to_target = self.get_status(avg_score, target)
         
         return avg_score, target, status, pct_to_target
     
+    @cached_kpi
     def recurring_service_ratio(self, filters=None):
         """Calculate recurring service ratio"""
-        services_df = self.data.get('completed_services', pd.DataFrame())
-        customer_df = self.data.get('customer_detail', pd.DataFrame())
+        services_df = self.data_loader.get_data('completed_services')
+        customer_df = self.data_loader.get_data('customer_detail')
         
         if services_df.empty:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            services_df = self._apply_filters(services_df, filters)
-        
-        # Merge with customer detail to get auto pay status
+        # Look up each serviced customer's auto pay status
         if 'Customer Id' in services_df.columns and 'Customer Id' in customer_df.columns:
-            merged = services_df.merge(
-                customer_df[['Customer Id', 'Auto Pay Flag']],
-                on='Customer Id',
-                how='left'
-            )
-            total_customers = merged['Customer Id'].nunique()
-            recurring_customers = merged[merged['Auto Pay Flag'] == True]['Customer Id'].nunique()
+            if self.distinct_counter is not None:
+                # Merged from HyperLogLog sketches instead of hashing the filtered ids
+                total_customers = self.distinct_counter.count('completed_services', 'Customer Id', filters)
+                recurring_customers = min(
+                    self.distinct_counter.count('completed_services', 'Customer Id', filters, population='auto_pay'),
+                    total_customers
+                )
+            else:
+                if filters:
+                    services_df = self.filter_engine.filter('completed_services', filters)
+                customer_ids = services_df['Customer Id'].dropna().unique()
+                total_customers = len(customer_ids)
+                recurring_customers = (self.auto_pay_counts(customer_ids) > 0).sum()
             
             ratio = recurring_customers / total_customers if total_customers > 0 else 0
         else:
@@ -241,27 +330,17 @@ class KPICalculator:
         
         return ratio, target, status, pct_to_target
     
+    @cached_kpi
     def service_accuracy(self, filters=None):
         """Calculate service accuracy (1 - callback rate)"""
-        df = self.data.get('completed_services', pd.DataFrame())
+        df = self.data_loader.get_data('completed_services')
         if df.empty:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
+        total_services = self.kpi_cube.total('completed_services', 'Rows', filters)
         
-        total_services = len(df)
-        
-        # Identify callbacks
-        callback_keywords = ['Callback', 'Call-back', 'Callback']
-        callback_mask = (
-            df['Type'].astype(str).str.contains('|'.join(callback_keywords), case=False, na=False) |
-            df['Name'].astype(str).str.contains('|'.join(callback_keywords), case=False, na=False) |
-            df['Category'].astype(str).str.contains('|'.join(callback_keywords), case=False, na=False)
-        )
-        
-        callback_services = callback_mask.sum()
+        # Callbacks are flagged at load (see DataLoader.FLAG_COLUMNS)
+        callback_services = self.kpi_cube.total('completed_services', 'Callbacks', filters)
         callback_rate = callback_services / total_services if total_services > 0 else 0
         accuracy = 1 - callback_rate
         
@@ -274,6 +353,7 @@ class KPICalculator:
     # FINANCIAL METRICS KPIs
     # ============================================================================
     
+    @cached_kpi
     def payroll_pct_revenue(self, filters=None):
         """Calculate payroll as percentage of revenue"""
         # This would need to be implemented based on actual Financials structure
@@ -281,18 +361,21 @@ class KPICalculator:
         target = self.TARGETS['payroll_pct_revenue']
         return 0.38, target, "Green", 0.95  # Placeholder
     
+    @cached_kpi
     def chemical_spend_pct(self, filters=None):
         """Calculate chemical spend as percentage of revenue"""
         # Placeholder
         target = self.TARGETS['chemical_spend_pct']
         return 0.072, target, "Green", 0.90  # Placeholder
     
+    @cached_kpi
     def ebitda_margin(self, filters=None):
         """Calculate EBITDA margin"""
         # Placeholder
         target = self.TARGETS['ebitda_margin']
         return 0.22, target, "Green", 1.10  # Placeholder
     
+    @cached_kpi
     def revenue_growth_yoy(self, filters=None):
         """Calculate revenue growth year-over-year"""
         # Placeholder
@@ -303,21 +386,15 @@ class KPICalculator:
     # CUSTOMER & PAYMENT KPIs
     # ============================================================================
     
+    @cached_kpi
     def auto_pay_enrollment(self, filters=None):
         """Calculate auto pay enrollment percentage"""
-        df = self.data.get('customer_detail', pd.DataFrame())
+        df = self.data_loader.get_data('customer_detail')
         if df.empty:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        total_customers = len(df)
-        if 'Auto Pay Flag' in df.columns:
-            auto_pay_customers = df['Auto Pay Flag'].sum()
-        else:
-            auto_pay_customers = 0
+        total_customers = self.kpi_cube.total('customer_detail', 'Rows', filters)
+        auto_pay_customers = self.kpi_cube.total('customer_detail', 'Auto Pay', filters)
         
         pct = auto_pay_customers / total_customers if total_customers > 0 else 0
         target = self.TARGETS['auto_pay_enrollment']
@@ -325,17 +402,15 @@ class KPICalculator:
         
         return pct, target, status, pct_to_target
     
+    @cached_kpi
     def avg_customer_review(self, filters=None):
         """Calculate average customer review score"""
-        df = self.data.get('customer_reviews', pd.DataFrame())
+        df = self.data_loader.get_data('customer_reviews')
         if df.empty or 'Overall Star Rating' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        avg_score = df['Overall Star Rating'].mean()
+        rating_count = self.kpi_cube.total('customer_reviews', 'Rating Count', filters)
+        avg_score = self.kpi_cube.total('customer_reviews', 'Rating Sum', filters) / rating_count if rating_count > 0 else np.nan
         target = self.TARGETS['avg_customer_review']
         status, pct_to_target = self.get_status(avg_score, target)
         
@@ -345,42 +420,33 @@ class KPICalculator:
     # FLEET & SAFETY KPIs
     # ============================================================================
     
+    @cached_kpi
     def total_ytd_revenue(self, filters=None):
         """Calculate total year-to-date revenue"""
-        df = self.data.get('completed_services', pd.DataFrame())
+        df = self.data_loader.get_data('completed_services')
         if df.empty or 'Invoice Amount' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
         current_year = datetime.now().year
-        if 'Service Date' in df.columns:
-            df['Year'] = pd.to_datetime(df['Service Date']).dt.year
-            ytd_revenue = df[df['Year'] == current_year]['Invoice Amount'].sum()
+        if 'Year' in df.columns:
+            ytd_revenue = self.kpi_cube.total('completed_services', 'Invoice Amount', self._year_filters(filters, current_year))
         else:
-            ytd_revenue = df['Invoice Amount'].sum()
+            ytd_revenue = self.kpi_cube.total('completed_services', 'Invoice Amount', filters)
         
         target = self.TARGETS['total_ytd_revenue']
         status, pct_to_target = self.get_status(ytd_revenue, target)
         
         return ytd_revenue, target, status, pct_to_target
     
+    @cached_kpi
     def avg_monthly_production_per_tech(self, filters=None):
         """Calculate average monthly production per tech"""
-        df = self.data.get('completed_services', pd.DataFrame())
+        df = self.data_loader.get_data('completed_services')
         if df.empty or 'Invoice Amount' not in df.columns:
             return 0, 0, "Gray", 0
         
-        # Apply filters
-        if filters:
-            df = self._apply_filters(df, filters)
-        
-        if 'Service Date' in df.columns and 'Tech Name' in df.columns:
-            df['Year Month'] = pd.to_datetime(df['Service Date']).dt.to_period('M')
-            monthly_revenue = df.groupby(['Tech Name', 'Year Month'])['Invoice Amount'].sum().reset_index()
-            monthly_avg_per_tech = monthly_revenue.groupby('Tech Name')['Invoice Amount'].mean().mean()
+        if self.kpi_cube.has_dimensions('completed_services', ['Tech Name', 'Year Month']):
+            monthly_avg_per_tech = self.kpi_cube.entity_monthly_means('completed_services', 'Tech Name', 'Invoice Amount', filters).mean()
         else:
             monthly_avg_per_tech = 0
         
@@ -390,39 +456,75 @@ class KPICalculator:
         return monthly_avg_per_tech, target, status, pct_to_target
     
     # ============================================================================
-    # HELPER METHODS
+    # CUSTOMER LOOKUPS
     # ============================================================================
     
-    def _apply_filters(self, df, filters):
-        """Apply filters to dataframe"""
-        filtered_df = df.copy()
-        
-        if 'branch' in filters and filters['branch'] and 'Branch' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Branch'] == filters['branch']]
-        
-        if 'sales_rep' in filters and filters['sales_rep']:
-            if 'Primary Sales Rep' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Primary Sales Rep'] == filters['sales_rep']]
-            elif 'Sales Rep' in filtered_df.columns:
-                filtered_df = filtered_df[filtered_df['Sales Rep'] == filters['sales_rep']]
-        
-        if 'technician' in filters and filters['technician'] and 'Tech Name' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Tech Name'] == filters['technician']]
-        
-        if 'category' in filters and filters['category'] and 'Category' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Category'] == filters['category']]
-        
-        if 'month' in filters and filters['month']:
-            date_col = None
-            if 'Service Date' in filtered_df.columns:
-                date_col = 'Service Date'
-            elif 'Sold Date' in filtered_df.columns:
-                date_col = 'Sold Date'
-            
-            if date_col:
-                filtered_df[date_col] = pd.to_datetime(filtered_df[date_col])
-                filtered_df['Month'] = filtered_df[date_col].dt.to_period('M')
-                filtered_df = filtered_df[filtered_df['Month'] == filters['month']]
+    def auto_pay_counts(self, customer_ids):
+        """Number of auto pay customer_detail rows for each Customer Id (0 when unknown)"""
+        ids, counts = self._get_auto_pay_lookup()
+        customer_ids = np.asarray(customer_ids, dtype=float)
+        if len(ids) == 0:
+            return np.zeros(len(customer_ids), dtype=np.int64)
+        
+        positions = np.minimum(np.searchsorted(ids, customer_ids), len(ids) - 1)
+        return np.where(ids[positions] == customer_ids, counts[positions], 0)
+    
+    def _get_auto_pay_lookup(self):
+        """Sorted Customer Ids with their auto pay row counts, built once per data version"""
+        version = self.data_loader.data_version
+        lookup = self._auto_pay_lookup
+        if lookup is not None and lookup[0] == version:
+            return lookup[1], lookup[2]
+        
+        customer_df = self.data_loader.get_data('customer_detail')
+        if 'Customer Id' in customer_df.columns and 'Auto Pay Flag' in customer_df.columns:
+            # Counts rather than flags, so duplicate ids weigh the same as in a merge
+            enrolled = customer_df.groupby('Customer Id')['Auto Pay Flag'].sum()
+            ids = enrolled.index.to_numpy(dtype=float)
+            counts = enrolled.to_numpy(dtype=np.int64)
+        else:
+            ids = np.empty(0, dtype=float)
+            counts = np.empty(0, dtype=np.int64)
         
-        return filtered_df
-
+        self._auto_pay_lookup = (version, ids, counts)
+        return ids, counts
+    
+    # ============================================================================
+    # HELPER METHODS
+    # ============================================================================
+    
+    def extend(self, previous):
+        """Carry a previous version's aggregates over, updated with the rows appended since (see DataLoader.refresh)"""
+        self.kpi_cube.extend(previous.kpi_cube, self.data_loader.appended_rows)
+    
+    def _year_filters(self, filters, year):
+        """Filters narrowed to one calendar year"""
+        return FilterEngine.within(filters, date(year, 1, 1), date(year, 12, 31))
+    
+    def _cached(self, key, compute):
+        """LRU cache lookup shared by the KPI methods and trends"""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._cache[key]
+            self.cache_misses += 1
+        
+        # Computed outside the lock; a concurrent miss on the same key just stores the same result
+        result = compute()
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    def cache_info(self):
+        """KPI cache statistics"""
+        with self._cache_lock:
+            return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache), 'max_size': self.cache_size}
+    
+    def clear_cache(self):
+        """Drop all cached KPI results"""
+        with self._cache_lock:
+            self._cache.clear()
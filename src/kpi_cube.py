@@ -0,0 +1,219 @@
+"""
+KPI Cube Module
+Additive aggregates of the fact tables over the dashboard filter dimensions
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.date_index import DateIndex
+from src.filter_engine import FilterEngine
+
+
+def monthly_means(entity_codes, month_codes, values, n_entities, n_months):
+    """Per-entity mean of monthly sums over the months with rows; NaN for entities without any"""
+    # Codes of -1 (missing entity or month) are skipped; missing values add 0, as in a pandas groupby sum
+    cells = entity_codes.astype(np.int64) * n_months + month_codes
+    keep = (entity_codes >= 0) & (month_codes >= 0)
+    if not keep.all():
+        cells, values = cells[keep], values[keep]
+    if np.isnan(values).any():
+        values = np.nan_to_num(values)
+    size = n_entities * n_months
+    monthly = np.bincount(cells, weights=values, minlength=size).reshape(n_entities, n_months)
+    months = (np.bincount(cells, minlength=size).reshape(n_entities, n_months) > 0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(months > 0, monthly.sum(axis=1) / months, np.nan)
+
+
+class KPICube:
+    """Per-table sums and counts grouped by the filter dimensions, built once per data version"""
+
+    def __init__(self, data_loader, cache_size=128):
+        self.data_loader = data_loader
+        self.data_version = None
+        self._cubes = {}
+        self._lock = threading.Lock()
+        # Recent filtered slices and rollups, shared by the KPIs of one scorecard
+        self.cache_size = cache_size
+        self._slices = OrderedDict()
+        # Cube cells are filtered with the same rules as the fact tables
+        self._filter_engine = FilterEngine(self)
+        # Cells have no day key, so date-ranged queries go to the prefix sums or the fact rows
+        self.date_index = DateIndex(self)
+        self._row_filter = FilterEngine(data_loader)
+
+    def get_data(self, table_name):
+        """Cube frame for a table: one row per observed dimension combination"""
+        with self._lock:
+            if self.data_version != self.data_loader.data_version:
+                self._cubes = {}
+                self._slices.clear()
+                self.data_version = self.data_loader.data_version
+            if table_name not in self._cubes:
+                self._cubes[table_name] = self._build(table_name)
+            return self._cubes[table_name]
+
+    def extend(self, previous, appended_rows):
+        """Start from a previous version's cubes, adding only the aggregates of the appended rows"""
+        cubes = {}
+        with previous._lock:
+            previous_cubes = dict(previous._cubes)
+        for table_name, rows in appended_rows.items():
+            if table_name in previous_cubes:
+                measures = list(self._measures(table_name, rows.iloc[:0]).columns)
+                cubes[table_name] = self._merge(previous_cubes[table_name], self._aggregate(table_name, rows), measures)
+        with self._lock:
+            self._cubes = cubes
+            self._slices.clear()
+            self.data_version = self.data_loader.data_version
+
+    def cells(self, table_name, filters=None):
+        """Cube cells matching the filters"""
+        if self._date_ranged(table_name, filters):
+            # Aggregate the matching fact rows into cells of the same shape
+            compute = lambda: self._aggregate(table_name, self._row_filter.filter(table_name, filters))
+        else:
+            compute = lambda: self._filter_engine.filter(table_name, filters)
+        return self._memoized(('cells', table_name, FilterEngine.filter_key(filters)), compute)
+
+    def total(self, table_name, measure, filters=None):
+        """Sum of one measure over the cells matching the filters"""
+        if self._date_ranged(table_name, filters):
+            value = self.date_index.range_total(table_name, measure, filters)
+            if value is not None:
+                return value
+        cells = self.cells(table_name, filters)
+        if measure not in cells.columns:
+            return 0
+        return cells[measure].sum()
+
+    def rollup(self, table_name, by, filters=None):
+        """Measures over the matching cells, summed per combination of the given dimensions"""
+        by_key = tuple(by) if isinstance(by, list) else by
+        return self._memoized(
+            ('rollup', table_name, by_key, FilterEngine.filter_key(filters)),
+            lambda: self.cells(table_name, filters).groupby(by, observed=True).sum(numeric_only=True)
+        )
+
+    def entity_monthly_means(self, table_name, entity, measure, filters=None):
+        """Average monthly measure per entity over the months it has cells in, in entity order"""
+        return self._memoized(
+            ('entity_monthly_means', table_name, entity, measure, FilterEngine.filter_key(filters)),
+            lambda: self._entity_monthly_means(self.cells(table_name, filters), entity, measure)
+        )
+
+    def has_dimensions(self, table_name, columns):
+        """Whether the table's cube is grouped by all of the given columns"""
+        cube = self.get_data(table_name)
+        return all(col in cube.columns for col in columns)
+
+    def measures(self, table_name):
+        """Per-row measures of a fact table, aligned with its rows"""
+        return self._measures(table_name, self.data_loader.get_data(table_name))
+
+    def _date_ranged(self, table_name, filters):
+        """Whether a date range filter applies to the table's rows"""
+        if not filters or filters.get('date_range') is None:
+            return False
+        return 'Date Key' in self.data_loader.get_data(table_name).columns
+
+    def _memoized(self, key, compute):
+        """LRU lookup of a slice or rollup for the current data version; results are shared, not copied"""
+        key = (self.data_loader.data_version,) + key
+        with self._lock:
+            if key in self._slices:
+                self._slices.move_to_end(key)
+                return self._slices[key]
+        result = compute()
+        with self._lock:
+            self._slices[key] = result
+            while len(self._slices) > self.cache_size:
+                self._slices.popitem(last=False)
+        return result
+
+    def _entity_monthly_means(self, cells, entity, measure):
+        """Integer-coded equivalent of a groupby over (entity, Year Month) sums, then the mean per entity"""
+        entities = cells[entity]
+        if isinstance(entities.dtype, pd.CategoricalDtype):
+            entity_codes = entities.cat.codes.to_numpy()
+            names = entities.cat.categories
+        else:
+            entity_codes, names = pd.factorize(entities, sort=True)
+            names = pd.Index(names)
+        # Months are only told apart, so their codes need no sorting
+        month_codes, months = pd.factorize(cells['Year Month'])
+
+        means = monthly_means(entity_codes, month_codes, cells[measure].to_numpy(dtype=np.float64, na_value=np.nan),
+                              len(names), len(months))
+        observed = ~np.isnan(means)
+        return pd.Series(means[observed], index=pd.Index(names[observed], name=entity), name=measure)
+
+    def _build(self, table_name):
+        """Aggregate a fact table's measures over its dimension columns"""
+        return self._aggregate(table_name, self.data_loader.get_data(table_name))
+
+    def _aggregate(self, table_name, df):
+        """Sum the measures of a table's rows per observed dimension combination"""
+        measures = self._measures(table_name, df)
+
+        dimensions = []
+        for columns in FilterEngine.FILTER_COLUMNS.values():
+            column = next((col for col in columns if col in df.columns), None)
+            if column is not None:
+                dimensions.append(column)
+
+        if not dimensions:
+            return measures.sum().to_frame().T
+        # dropna=False keeps rows with a missing dimension in the unfiltered totals
+        keys = [df[col] for col in dimensions]
+        return measures.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+
+    def _merge(self, cube, delta, measures):
+        """Sum two cube frames of the same table cell by cell"""
+        dimensions = [col for col in cube.columns if col not in measures]
+        if not dimensions:
+            return pd.concat([cube, delta]).sum().to_frame().T
+        
+        cube = cube.copy(deep=False)
+        for col in dimensions:
+            # Dictionaries only grow, so the delta's categories extend the cube's
+            if isinstance(cube[col].dtype, pd.CategoricalDtype) and isinstance(delta[col].dtype, pd.CategoricalDtype):
+                cube[col] = cube[col].cat.set_categories(delta[col].cat.categories)
+        cells = pd.concat([cube, delta], ignore_index=True)
+        return cells.groupby(dimensions, observed=True, dropna=False, sort=False)[measures].sum().reset_index()
+
+    def _measures(self, table_name, df):
+        """Numeric per-row measures for a table, ready to be summed"""
+        measures = pd.DataFrame(index=df.index)
+        measures['Rows'] = np.ones(len(df), dtype=np.int64)
+
+        if table_name == 'completed_services':
+            if 'Invoice Amount' in df.columns:
+                measures['Invoice Amount'] = df['Invoice Amount']
+            if 'Is Callback' in df.columns:
+                measures['Callbacks'] = df['Is Callback'].astype(np.int64)
+        elif table_name in ('sales_by_tech', 'lost_sales'):
+            if 'Contract Value' in df.columns:
+                measures['Contract Value'] = df['Contract Value']
+                if 'Is Recurring' in df.columns:
+                    measures['Recurring Contract Value'] = df['Contract Value'].where(df['Is Recurring'], 0.0)
+        elif table_name == 'customer_detail':
+            if 'Auto Pay Flag' in df.columns:
+                measures['Auto Pay'] = df['Auto Pay Flag'].astype(np.int64)
+        elif table_name == 'tech_reviews':
+            if 'Average Star Rating' in df.columns:
+                measures['Rating Sum'] = df['Average Star Rating']
+                measures['Rating Count'] = df['Average Star Rating'].notna().astype(np.int64)
+                if 'Total Ratings' in df.columns:
+                    measures['Weighted Rating Sum'] = df['Average Star Rating'] * df['Total Ratings']
+                    measures['Total Ratings'] = df['Total Ratings']
+        elif table_name == 'customer_reviews':
+            if 'Overall Star Rating' in df.columns:
+                measures['Rating Sum'] = df['Overall Star Rating']
+                measures['Rating Count'] = df['Overall Star Rating'].notna().astype(np.int64)
+
+        return measures
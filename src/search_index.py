@@ -0,0 +1,118 @@
+"""
+Search Index Module
+Inverted token indexes for free-text search over table columns
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class SearchIndex:
+    """Maps each lowercase word of a table's text columns to the rows containing it"""
+
+    TOKEN_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, data_loader):
+        self.data_loader = data_loader
+        self._indexes = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def tokenize(cls, text):
+        """Lowercase words of a text"""
+        return cls.TOKEN_PATTERN.findall(str(text).lower())
+
+    def search(self, table_name, query, columns, prefix=True):
+        """Sorted positions of the rows containing every word of the query (as a word prefix unless prefix=False); None for a query without words"""
+        terms = set(self.tokenize(query))
+        if not terms:
+            return None
+        vocabulary, order, offsets = self._get_index(table_name, tuple(columns))
+        row_count = len(self.data_loader.get_data(table_name))
+
+        positions = None
+        # Longer words usually match fewer rows, which keeps the intersections small
+        for term in sorted(terms, key=len, reverse=True):
+            start = np.searchsorted(vocabulary, term)
+            end = np.searchsorted(vocabulary, term + '\uffff' if prefix else term, side='right')
+            if start == end:
+                return np.empty(0, dtype=np.intp)
+            matches = order[offsets[start]:offsets[end]]
+            if end - start == 1 and positions is None:
+                positions = matches
+                continue
+            # Several words share the prefix and a row may hold more than one; a row mask
+            # dedupes and intersects the position lists in linear time
+            selected = np.zeros(row_count, dtype=bool)
+            selected[matches] = True
+            positions = np.flatnonzero(selected) if positions is None else positions[selected[positions]]
+            if len(positions) == 0:
+                break
+        return positions
+
+    def _get_index(self, table_name, columns):
+        """Index of a table's columns, built on first use for each data version"""
+        df = self.data_loader.get_data(table_name)
+        key = (table_name, columns)
+        with self._lock:
+            if self._version != self.data_loader.data_version:
+                self._indexes = {}
+                self._version = self.data_loader.data_version
+            if key in self._indexes:
+                return self._indexes[key]
+        index = self._build_index(df, [col for col in columns if col in df.columns])
+        with self._lock:
+            if self._version == self.data_loader.data_version:
+                self._indexes[key] = index
+        return index
+
+    def _build_index(self, df, columns):
+        """(sorted vocabulary, row positions grouped by word, group offsets); each distinct cell value is tokenized once"""
+        word_ids = {}
+        row_parts, token_parts = [], []
+        for column in columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy().astype(np.intp)
+                values = series.cat.categories
+            else:
+                codes, values = pd.factorize(series)
+            # Rows grouped by value code
+            row_order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            starts = np.concatenate([[0], np.cumsum(counts)])[:-1] + np.count_nonzero(codes < 0)
+
+            value_ids, tokens = [], []
+            for value_id, value in enumerate(values):
+                words = set(self.tokenize(value))
+                value_ids += [value_id] * len(words)
+                tokens += [word_ids.setdefault(word, len(word_ids)) for word in words]
+            value_ids = np.asarray(value_ids, dtype=np.intp)
+            lengths = counts[value_ids]
+            # Expand every (value, word) pair to the rows holding that value
+            first = np.repeat(starts[value_ids] - np.cumsum(lengths) + lengths, lengths)
+            row_parts.append(row_order[first + np.arange(lengths.sum())])
+            token_parts.append(np.repeat(np.asarray(tokens, dtype=np.intp), lengths))
+
+        if not row_parts:
+            return np.array([], dtype=str), np.empty(0, dtype=np.intp), np.zeros(1, dtype=np.intp)
+        rows = np.concatenate(row_parts)
+        # Renumber words in sorted order so every prefix is a contiguous id range
+        words = np.array(list(word_ids), dtype=str)
+        word_order = np.argsort(words)
+        ranks = np.empty(len(words), dtype=np.intp)
+        ranks[word_order] = np.arange(len(words))
+        vocabulary = words[word_order]
+        token_ids = ranks[np.concatenate(token_parts)]
+        # Group by word, rows ascending, and drop words repeated across columns of a row
+        order = np.lexsort((rows, token_ids))
+        token_ids, rows = token_ids[order], rows[order]
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (token_ids[1:] != token_ids[:-1]) | (rows[1:] != rows[:-1])
+        token_ids, rows = token_ids[keep], rows[keep]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(token_ids, minlength=len(vocabulary)))])
+        return vocabulary, rows, offsets
@@ -0,0 +1,78 @@
+"""
+Table Pager Module
+Sorted, paginated slices of a table for display
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+class TablePager:
+    """Serves one page of a table's rows at a time, in an order taken from cached per-column sort permutations"""
+
+    def __init__(self, data_loader):
+        self.data_loader = data_loader
+        self._orders = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def page(self, table_name, rows=None, sort_by=None, ascending=True, page=0, page_size=100, columns=None):
+        """Rows of one page (0-based) in display order, restricted to the given row positions and columns"""
+        df = self.data_loader.get_data(table_name)
+        positions = self.ordered_rows(table_name, rows, sort_by, ascending)
+        page_rows = positions[page * page_size:(page + 1) * page_size]
+        # Take the page's rows before projecting, so no full-length column is copied
+        page_df = df.take(page_rows)
+        return page_df if columns is None else page_df.iloc[:, page_df.columns.get_indexer(columns)]
+
+    def ordered_rows(self, table_name, rows=None, sort_by=None, ascending=True):
+        """Row positions (all rows when None) in display order; unsorted rows keep the table order"""
+        df = self.data_loader.get_data(table_name)
+        if sort_by is None or sort_by not in df.columns:
+            return np.arange(len(df)) if rows is None else np.asarray(rows)
+
+        order = self._get_order(table_name, sort_by, ascending)
+        if rows is None:
+            return order
+        # Keep the cached order's rows that are in the subset
+        selected = np.zeros(len(df), dtype=bool)
+        selected[rows] = True
+        return order[selected[order]]
+
+    def _get_order(self, table_name, column, ascending):
+        """Stable sort permutation of a column, built on first use for each data version"""
+        df = self.data_loader.get_data(table_name)
+        key = (table_name, column, ascending)
+        with self._lock:
+            if self._version != self.data_loader.data_version:
+                self._orders = {}
+                self._version = self.data_loader.data_version
+            if key in self._orders:
+                return self._orders[key]
+        order = self._build_order(df[column], ascending)
+        with self._lock:
+            if self._version == self.data_loader.data_version:
+                self._orders[key] = order
+        return order
+
+    def _build_order(self, series, ascending):
+        """Row positions sorted by value, ties in table order and missing values last"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Shared dictionaries are in load order; sort members by value instead
+            categories = series.cat.categories
+            try:
+                ranks = np.argsort(categories.argsort())
+            except TypeError:
+                ranks = np.argsort(categories.astype(str).argsort())
+            codes = series.cat.codes.to_numpy()
+            series = pd.Series(np.where(codes >= 0, ranks[codes], np.nan))
+        else:
+            series = series.reset_index(drop=True)
+        try:
+            ordered = series.sort_values(ascending=ascending, kind='stable', na_position='last')
+        except TypeError:
+            # Mixed types in an object column sort by their text
+            ordered = series.astype(str).where(series.notna()).sort_values(ascending=ascending, kind='stable', na_position='last')
+        return ordered.index.to_numpy()
@@ -0,0 +1,188 @@
+"""
+Trend Engine Module
+KPI time series computed in one grouped pass over precomputed period keys
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class TrendEngine:
+    """Per-period KPI values; each period matches the KPI card with that period as a filter"""
+
+    # Trend frequency -> period key column added by DataLoader._add_date_columns
+    PERIOD_COLUMNS = {
+        'M': 'Year Month',
+        'Q': 'Year Quarter',
+        'W': 'Year Week'
+    }
+
+    # Periods per year, for year-over-year comparisons
+    PERIODS_PER_YEAR = {'M': 12, 'Q': 4, 'W': 52}
+
+    # KPIs where lower is better
+    REVERSE_KPIS = ['cancellation_rate']
+
+    def __init__(self, kpi_calculator):
+        self.kpi_calculator = kpi_calculator
+
+    def trend(self, name, filters=None, freq='M'):
+        """One row per period with Value, Target, Status and Pct to Target"""
+        if freq not in self.PERIOD_COLUMNS:
+            raise ValueError(f"Unsupported trend frequency: {freq}")
+        target = self.kpi_calculator.TARGETS[name]
+
+        series_method = getattr(self, '_' + name, None)
+        if series_method is None:
+            # KPIs over undated tables ignore the month filter, so the card holds for every period
+            value, target, status, pct = getattr(self.kpi_calculator, name)(filters)
+            periods = self._periods('completed_services', filters, freq)
+            return pd.DataFrame({
+                'Period': periods, 'Value': value, 'Target': target, 'Status': status, 'Pct to Target': pct
+            })
+
+        values = series_method(filters, freq)
+        statuses, pct = self.kpi_calculator.get_statuses(values, target, name in self.REVERSE_KPIS)
+        return pd.DataFrame({
+            'Period': values.index, 'Value': values.to_numpy(dtype=float), 'Target': target,
+            'Status': statuses, 'Pct to Target': pct
+        })
+
+    # ============================================================================
+    # SALES & GROWTH
+    # ============================================================================
+
+    def _monthly_sales_per_rep(self, filters, freq):
+        """Average monthly sales per rep within each period"""
+        return self._mean_monthly_per_entity('sales_by_tech', 'Primary Sales Rep', 'Contract Value', filters, freq)
+
+    def _recurring_sales_pct(self, filters, freq):
+        """Recurring share of contract value per period"""
+        df, periods = self._rows('sales_by_tech', filters, freq, ['Contract Value', 'Is Recurring'])
+        if df is None:
+            return self._empty()
+        total = df['Contract Value'].groupby(periods).sum()
+        recurring = df['Contract Value'].where(df['Is Recurring'], 0.0).groupby(periods).sum()
+        return self._ratio(recurring, total)
+
+    def _organic_growth_yoy(self, filters, freq):
+        """Sales growth of each period over the same period a year earlier"""
+        df, periods = self._rows('sales_by_tech', filters, freq, ['Contract Value'])
+        if df is None:
+            return self._empty()
+        sales = df['Contract Value'].groupby(periods).sum()
+        previous = sales.reindex(sales.index - self.PERIODS_PER_YEAR[freq]).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(previous > 0, (sales.to_numpy() - previous) / previous, np.nan)
+        return pd.Series(growth, index=sales.index)
+
+    def _cancellation_rate(self, filters, freq):
+        """Lost share of sales opportunities per period"""
+        sales_df, sales_periods = self._rows('sales_by_tech', filters, freq, ['Contract Value'])
+        lost_df, lost_periods = self._rows('lost_sales', filters, freq, ['Contract Value'])
+        if sales_df is None:
+            return self._empty()
+        sales = sales_df['Contract Value'].groupby(sales_periods).sum()
+        lost = lost_df['Contract Value'].groupby(lost_periods).sum() if lost_df is not None else self._empty()
+        totals = pd.concat([sales, lost], axis=1).fillna(0).sort_index()
+        return self._ratio(totals.iloc[:, 1], totals.iloc[:, 0] + totals.iloc[:, 1])
+
+    # ============================================================================
+    # TECHNICIAN PERFORMANCE
+    # ============================================================================
+
+    def _completion_rate(self, filters, freq):
+        """Completion rate per period (every listed service is completed)"""
+        df, periods = self._rows('completed_services', filters, freq, [])
+        if df is None:
+            return self._empty()
+        completed = periods.groupby(periods).size()
+        return self._ratio(completed, completed)
+
+    def _recurring_service_ratio(self, filters, freq):
+        """Share of serviced customers on auto pay per period"""
+        df, periods = self._rows('completed_services', filters, freq, ['Customer Id'])
+        if df is None or 'Customer Id' not in self.kpi_calculator.data_loader.get_data('customer_detail').columns:
+            return self._empty()
+        customer_ids = df['Customer Id']
+        enrolled = self.kpi_calculator.auto_pay_counts(customer_ids) > 0
+        total = customer_ids.groupby(periods).nunique()
+        recurring = customer_ids[enrolled].groupby(periods[enrolled]).nunique().reindex(total.index, fill_value=0)
+        return self._ratio(recurring, total)
+
+    def _service_accuracy(self, filters, freq):
+        """One minus the callback rate per period"""
+        df, periods = self._rows('completed_services', filters, freq, ['Is Callback'])
+        if df is None:
+            return self._empty()
+        services = periods.groupby(periods).size()
+        callbacks = df['Is Callback'].groupby(periods).sum()
+        return 1 - self._ratio(callbacks, services)
+
+    # ============================================================================
+    # CUSTOMER & PAYMENT
+    # ============================================================================
+
+    def _avg_customer_review(self, filters, freq):
+        """Average overall star rating per period"""
+        df, periods = self._rows('customer_reviews', filters, freq, ['Overall Star Rating'])
+        if df is None:
+            return self._empty()
+        return df['Overall Star Rating'].groupby(periods).mean()
+
+    # ============================================================================
+    # FLEET & SAFETY
+    # ============================================================================
+
+    def _total_ytd_revenue(self, filters, freq):
+        """Running year-to-date revenue at the end of each period"""
+        df, periods = self._rows('completed_services', filters, freq, ['Invoice Amount'])
+        if df is None:
+            return self._empty()
+        revenue = df['Invoice Amount'].groupby(periods).sum()
+        return revenue.groupby(revenue.index.year).cumsum()
+
+    def _avg_monthly_production_per_tech(self, filters, freq):
+        """Average monthly production per tech within each period"""
+        return self._mean_monthly_per_entity('completed_services', 'Tech Name', 'Invoice Amount', filters, freq)
+
+    # ============================================================================
+    # HELPER METHODS
+    # ============================================================================
+
+    def _rows(self, table_name, filters, freq, columns):
+        """Filtered rows of a table with their period keys, or (None, None) if it is empty or lacks a column"""
+        # Same guard as the cards, which go Gray when the unfiltered table is empty
+        if self.kpi_calculator.data_loader.get_data(table_name).empty:
+            return None, None
+        df = self.kpi_calculator.filter_engine.filter(table_name, filters)
+        period_col = self.PERIOD_COLUMNS[freq]
+        if period_col not in df.columns or any(col not in df.columns for col in columns):
+            return None, None
+        return df, df[period_col].rename('Period')
+
+    def _periods(self, table_name, filters, freq):
+        """Sorted periods present in a table's filtered rows"""
+        df, periods = self._rows(table_name, filters, freq, [])
+        if df is None:
+            return pd.PeriodIndex([], freq=freq)
+        return pd.PeriodIndex(periods.dropna().unique(), freq=periods.dt.freq).sort_values()
+
+    def _mean_monthly_per_entity(self, table_name, entity, measure, filters, freq):
+        """Mean over entities of their average monthly measure, per period"""
+        df, periods = self._rows(table_name, filters, freq, [entity, measure, 'Year Month'])
+        if df is None:
+            return self._empty()
+        monthly = df[measure].groupby([periods, df[entity], df['Year Month']], observed=True).sum()
+        per_entity = monthly.groupby(level=[0, 1], observed=True).mean()
+        return per_entity.groupby(level=0).mean()
+
+    def _ratio(self, numerator, denominator):
+        """numerator / denominator per period, 0 where the denominator is 0 (as on the cards)"""
+        numerator = numerator.astype(float)
+        denominator = denominator.astype(float)
+        return (numerator / denominator.where(denominator > 0)).fillna(0.0)
+
+    def _empty(self):
+        """Empty per-period series"""
+        return pd.Series(dtype=float, index=pd.PeriodIndex([], freq='M', name='Period'))
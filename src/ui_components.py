@@ -8,6 +8,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 
+from src.filter_catalog import FILTER_TABLES
+
+# Traffic light colors by KPI status
+STATUS_COLORS = {
+    "Green": "#00B050",
+    "Yellow": "#FFC000",
+    "Red": "#FF0000",
+    "Gray": "#808080"
+}
+
 
 def render_kpi_card(title, value, target, status, pct_to_target, format_type="number"):
     """Render a KPI card with traffic light status"""
@@ -27,12 +37,6 @@ def render_kpi_card(title, value, target, status, pct_to_target, format_type="nu
         target_str = f"Target: {target:,.0f}"
     
     # Status color
-    status_colors = {
-        "Green": "#00B050",
-        "Yellow": "#FFC000",
-        "Red": "#FF0000",
-        "Gray": "#808080"
-    }
     status_icons = {
         "Green": "🟢",
         "Yellow": "🟡",
@@ -40,7 +44,7 @@ def render_kpi_card(title, value, target, status, pct_to_target, format_type="nu
         "Gray": "⚪"
     }
     
-    color = status_colors.get(status, "#808080")
+    color = STATUS_COLORS.get(status, "#808080")
     icon = status_icons.get(status, "⚪")
     
     # Card HTML
@@ -67,65 +71,22 @@ def render_kpi_card(title, value, target, status, pct_to_target, format_type="nu
     st.markdown(card_html, unsafe_allow_html=True)
 
 
-def get_filters(data_loader):
-    """Get filter options from data"""
-    filters = {}
-    
-    # Branch filter
-    branches = []
-    for table_name in ['completed_services', 'sales_by_tech', 'customer_detail']:
-        df = data_loader.get_data(table_name)
-        if 'Branch' in df.columns:
-            branches.extend(df['Branch'].dropna().unique().tolist())
-    filters['branches'] = sorted(list(set(branches))) if branches else []
-    
-    # Sales Rep filter
-    sales_reps = []
-    sales_df = data_loader.get_data('sales_by_tech')
-    if 'Primary Sales Rep' in sales_df.columns:
-        sales_reps.extend(sales_df['Primary Sales Rep'].dropna().unique().tolist())
-    lost_df = data_loader.get_data('lost_sales')
-    if 'Sales Rep' in lost_df.columns:
-        sales_reps.extend(lost_df['Sales Rep'].dropna().unique().tolist())
-    filters['sales_reps'] = sorted(list(set(sales_reps))) if sales_reps else []
-    
-    # Technician filter
-    techs = []
-    services_df = data_loader.get_data('completed_services')
-    if 'Tech Name' in services_df.columns:
-        techs.extend(services_df['Tech Name'].dropna().unique().tolist())
-    filters['technicians'] = sorted(list(set(techs))) if techs else []
-    
-    # Category filter
-    categories = []
-    for table_name in ['completed_services', 'sales_by_tech']:
-        df = data_loader.get_data(table_name)
-        if 'Category' in df.columns:
-            categories.extend(df['Category'].dropna().unique().tolist())
-    filters['categories'] = sorted(list(set(categories))) if categories else []
-    
-    # Month filter
-    months = []
-    services_df = data_loader.get_data('completed_services')
-    if not services_df.empty and 'Service Date' in services_df.columns:
-        try:
-            services_df_copy = services_df.copy()
-            services_df_copy['Year Month'] = pd.to_datetime(services_df_copy['Service Date'], errors='coerce').dt.to_period('M')
-            months = sorted(services_df_copy['Year Month'].dropna().unique().tolist())
-        except Exception:
-            months = []
-    filters['months'] = months
-    
-    return filters
+def _selected_date_range(selection, bounds):
+    """Date range filter from a date_input selection; None for the full range or an unfinished selection"""
+    if not isinstance(selection, (tuple, list)) or len(selection) != 2:
+        return None
+    if tuple(selection) == tuple(bounds):
+        return None
+    return tuple(selection)
 
 
-def render_filters(data_loader, location="sidebar"):
+def render_filters(dataset, location="sidebar"):
     """Render filter controls"""
     try:
-        filter_options = get_filters(data_loader)
+        filter_options = dataset.filter_catalog()
     except Exception as e:
         st.warning(f"Error loading filters: {str(e)}")
-        filter_options = {'branches': [], 'sales_reps': [], 'technicians': [], 'categories': [], 'months': []}
+        filter_options = {'branches': [], 'sales_reps': [], 'technicians': [], 'categories': [], 'months': [], 'date_bounds': None}
     
     filters = {}
     
@@ -133,7 +94,7 @@ def render_filters(data_loader, location="sidebar"):
         container = st.sidebar
     else:
         # For top location, use regular columns
-        cols = st.columns(5)
+        cols = st.columns(6)
         col_idx = 0
     
     if location == "sidebar":
@@ -164,6 +125,11 @@ def render_filters(data_loader, location="sidebar"):
                 filters['month'] = None
             else:
                 filters['month'] = pd.Period(filters['month'])
+        
+        if filter_options['date_bounds']:
+            bounds = filter_options['date_bounds']
+            selection = st.sidebar.date_input("Date Range", value=bounds, min_value=bounds[0], max_value=bounds[1])
+            filters['date_range'] = _selected_date_range(selection, bounds)
     else:
         # Horizontal filters
         if filter_options['branches']:
@@ -196,6 +162,12 @@ def render_filters(data_loader, location="sidebar"):
                 filters['month'] = None
             else:
                 filters['month'] = pd.Period(filters['month'])
+            col_idx += 1
+        
+        if filter_options['date_bounds']:
+            bounds = filter_options['date_bounds']
+            selection = cols[col_idx].date_input("Date Range", value=bounds, min_value=bounds[0], max_value=bounds[1])
+            filters['date_range'] = _selected_date_range(selection, bounds)
     
     return filters
 
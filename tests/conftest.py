@@ -0,0 +1,84 @@
+"""
+Test configuration
+Makes the app's src package importable, as app.py does, and builds small sample workbooks
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_loader import DataLoader
+
+COMPLETED_SERVICES = ['Branch', 'Category', 'Type', 'Name', 'Customer Id', 'Customer Name', 'Tech Name',
+                      'Service Date', 'Appt Amount', 'Invoice Amount']
+SALES_BY_TECH = ['Customer Id', 'Customer Name', 'Service Status', 'Category', 'Sold Date',
+                 'Init Price', 'Reg Price', 'Contract Value', 'Primary Sales Rep']
+
+BRANCHES = ['North', 'South', 'East Coast']
+CATEGORIES = ['Monthly - Pest Control', 'Quarterly - Pest Control', 'Callback / Retreat']
+SERVICE_NAMES = ['General Pest', 'Call-back visit', 'Termite Control', 'Lawn Care & Weed Control']
+
+
+def customer_id(i):
+    """Mostly numbers, with text IDs and blanks in places, so streamed chunks type the column differently"""
+    if i % 11 == 5:
+        return 'n/a'
+    if i % 7 == 3:
+        return str(1000 + i)
+    return 1000 + i
+
+
+def amount(i):
+    """Numbers, whole numbers and currency text"""
+    if i % 5 == 0:
+        return f"${100 + i:,.2f}"
+    return 100 + i if i % 3 == 0 else 100.25 + i
+
+
+def row_date(i, blank_every):
+    """Dates spread over about two and a half years, out of order, with some blanks"""
+    if i % blank_every == 4:
+        return None
+    return datetime(2023, 1, 1) + timedelta(days=i * 37 % 900)
+
+
+def service_row(i):
+    branch = None if i % 29 == 9 else BRANCHES[i % 3]
+    return [branch, CATEGORIES[i % 3], 'Service', SERVICE_NAMES[i % 4], customer_id(i), f"Customer {i}",
+            f"Tech {i % 4}", row_date(i, 13), amount(i), amount(i + 1)]
+
+
+def sale_row(i):
+    return [customer_id(i), f"Customer {i}", 'Active', CATEGORIES[(i + 1) % 3], row_date(i, 17),
+            amount(i), amount(i + 2), amount(i + 3), f"Rep {i % 3}"]
+
+
+def write_sample_workbook(path, rows, edit=None):
+    """Workbook with both append-only sheets holding the given number of rows; `edit` renames one row's customer"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, header, make_row in [('Completed Services', COMPLETED_SERVICES, service_row),
+                                         ('Sales by Tech', SALES_BY_TECH, sale_row)]:
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(header)
+        for i in range(rows):
+            row = make_row(i)
+            if edit == i:
+                row[header.index('Customer Name')] = 'Edited'
+            sheet.append(row)
+    workbook.save(path)
+
+
+@pytest.fixture(scope='session')
+def sample_loader(tmp_path_factory):
+    """Loader over a 400-row sample workbook, with both fact tables and the date table loaded"""
+    path = tmp_path_factory.mktemp('workbook') / 'sample.xlsx'
+    write_sample_workbook(path, 400)
+    loader = DataLoader(str(path), use_cache=False)
+    loader.prefetch(['completed_services', 'sales_by_tech', 'date_table'])
+    return loader
@@ -0,0 +1,77 @@
+"""
+Cleaning Tests
+The vectorized column cleaners against the per-value clean_currency and clean_numeric_id
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import DataLoader
+
+# Text cells seen in the workbook's amount and ID columns, plus edge cases
+TEXT_VALUES = [
+    '12', ' 12.50 ', '$1,234.56', '-7', '+3', '.5', '5.', '1e3', '2E-2', '12.9', '-12.9',
+    'inf', '-Infinity', '', '   ', 'abc', '12abc', '$', '1 000', '0x10',
+    '1_000', '１２', '٣', None
+]
+
+
+@pytest.fixture
+def loader():
+    """Loader whose workbook is never opened"""
+    return DataLoader('unused.xlsx')
+
+
+def as_float(value):
+    """None as NaN, so results compare with nan-aware equality"""
+    return np.nan if value is None else float(value)
+
+
+@pytest.mark.parametrize('values', [
+    TEXT_VALUES,
+    [1, 2.5, None, -3],
+    [1.0, np.nan, 2.0],
+    [12, '$5', 'x', 7.25, None]
+])
+def test_currency_series_matches_scalar(loader, values):
+    expected = [loader.clean_currency(v) for v in values]
+    result = loader.clean_currency_series(pd.Series(values, dtype=object))
+    np.testing.assert_array_equal(result.to_numpy(), np.array(expected, dtype=float))
+
+
+@pytest.mark.parametrize('values', [
+    [v for v in TEXT_VALUES if v not in ('inf', '-Infinity')],
+    [1, 2.5, None, -3],
+    [1.0, np.nan, 2.9],
+    [12, '5', 'x', -7.25, None]
+])
+def test_numeric_id_series_matches_scalar(loader, values):
+    expected = [as_float(loader.clean_numeric_id(v)) for v in values]
+    result = loader.clean_numeric_id_series(pd.Series(values, dtype=object))
+    np.testing.assert_array_equal(result.to_numpy(dtype=float), np.array(expected, dtype=float))
+
+
+@pytest.mark.parametrize('text, expected', [('1_000', 1000.0), ('１２', 12.0), ('٣', 3.0)])
+def test_float_syntax_beyond_ascii_digits(loader, text, expected):
+    assert loader.clean_currency(text) == expected
+    assert loader.clean_currency_series(pd.Series([text, 'x'])).tolist() == [expected, 0.0]
+    assert loader.clean_numeric_id_series(pd.Series([text, 'x'])).tolist()[0] == expected
+
+
+def test_all_numeric_ids_become_integers(loader):
+    result = loader.clean_numeric_id_series(pd.Series(['1', ' 2 ', '3.7', '-4.2']))
+    assert result.dtype == np.int64
+    assert result.tolist() == [1, 2, 3, -4]
+
+
+def test_infinite_ids_are_missing(loader):
+    assert loader.clean_numeric_id('inf') is None
+    assert np.isnan(loader.clean_numeric_id_series(pd.Series(['inf', '1'])).iloc[0])
+
+
+@pytest.mark.parametrize('text', ['nan', 'NaN', '-nan'])
+def test_nan_text_amount_is_zero_in_columns(loader, text):
+    # Documented difference: the scalar path returns NaN, a column treats it as a missing amount
+    assert np.isnan(loader.clean_currency(text))
+    assert loader.clean_currency_series(pd.Series([text, '1'])).tolist() == [0.0, 1.0]
@@ -0,0 +1,77 @@
+"""
+Date Index Tests
+range_total against summing the matching rows directly
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.filter_engine import FilterEngine
+from src.kpi_cube import KPICube
+
+# Table -> (date column, measures)
+MEASURES = {
+    'completed_services': ('Service Date', ['Invoice Amount', 'Callbacks', 'Rows']),
+    'sales_by_tech': ('Sold Date', ['Contract Value', 'Recurring Contract Value', 'Rows'])
+}
+
+DATE_RANGES = [
+    (date(2023, 1, 1), date(2023, 12, 31)),
+    (date(2024, 2, 29), date(2024, 2, 29)),
+    (date(2023, 6, 15), date(2025, 3, 1)),
+    (date(2019, 1, 1), date(2022, 12, 31)),
+    (date(2025, 1, 1), date(2030, 1, 1)),
+    (date(2024, 5, 1), date(2024, 4, 1))
+]
+
+
+def direct_total(df, measures, measure, date_column, filters):
+    """Sum of the measure over rows dated within the range and month, matching the dimension filter"""
+    dates = df[date_column]
+    mask = dates.notna()
+    start, end = filters['date_range']
+    mask &= (dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end) + pd.Timedelta(days=1))
+    if filters.get('month') is not None:
+        mask &= dates.dt.to_period('M') == filters['month']
+    for filter_name, columns in FilterEngine.FILTER_COLUMNS.items():
+        column = next((col for col in columns if col in df.columns), None)
+        if filter_name != 'month' and filters.get(filter_name) is not None and column is not None:
+            mask &= (df[column] == filters[filter_name]).fillna(False).astype(bool)
+    return float(measures[measure][mask.to_numpy()].sum())
+
+
+@pytest.mark.parametrize('table_name', list(MEASURES))
+def test_range_total_matches_direct_sum(sample_loader, table_name):
+    cube = KPICube(sample_loader)
+    df = sample_loader.get_data(table_name)
+    measures = cube.measures(table_name)
+    date_column, measure_names = MEASURES[table_name]
+
+    dimension_filters = [{}, {'month': pd.Period('2024-02', freq='M')}, {'branch': 'Nobody'}]
+    for filter_name in cube.date_index.DIMENSIONS:
+        column = next((col for col in FilterEngine.FILTER_COLUMNS[filter_name] if col in df.columns), None)
+        if column is not None:
+            dimension_filters += [{filter_name: value} for value in df[column].dropna().unique()]
+
+    checked = 0
+    for measure in measure_names:
+        for date_range in DATE_RANGES:
+            for dimension_filter in dimension_filters:
+                filters = dict(dimension_filter, date_range=date_range)
+                total = cube.date_index.range_total(table_name, measure, filters)
+                assert total is not None, filters
+                assert total == pytest.approx(direct_total(df, measures, measure, date_column, filters), abs=1e-6), filters
+                checked += 1
+    assert checked > 100
+
+
+def test_several_dimensions_are_left_to_the_cube(sample_loader):
+    cube = KPICube(sample_loader)
+    filters = {'branch': 'North', 'technician': 'Tech 1', 'date_range': DATE_RANGES[0]}
+    assert cube.date_index.range_total('completed_services', 'Invoice Amount', filters) is None
+    # The cube answers it from the matching rows instead
+    df = sample_loader.get_data('completed_services')
+    expected = direct_total(df, cube.measures('completed_services'), 'Invoice Amount', 'Service Date', filters)
+    assert cube.total('completed_services', 'Invoice Amount', filters) == pytest.approx(expected)
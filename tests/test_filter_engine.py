@@ -0,0 +1,83 @@
+"""
+Filter Engine Tests
+row_indexer against the copy-and-mask filtering it replaced
+"""
+
+import itertools
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filter_engine import FilterEngine
+
+TABLES = ['completed_services', 'sales_by_tech']
+
+
+def mask_filter(df, filters):
+    """Rows kept by the old _apply_filters, plus the date range as an inclusive Date Key mask"""
+    mask = pd.Series(True, index=df.index)
+    for filter_name, columns in FilterEngine.FILTER_COLUMNS.items():
+        value = filters.get(filter_name)
+        column = next((col for col in columns if col in df.columns), None)
+        if value and column is not None:
+            mask &= (df[column] == value).fillna(False).astype(bool)
+    date_range = filters.get('date_range')
+    if date_range and 'Date Key' in df.columns:
+        keys = df['Date Key']
+        mask &= ((keys >= FilterEngine.date_key(date_range[0])) & (keys <= FilterEngine.date_key(date_range[1]))).fillna(False).astype(bool)
+    return np.flatnonzero(mask.to_numpy())
+
+
+def sample_filters(df):
+    """Single filters on every value, pairs and triples of them, date ranges and values the table lacks"""
+    options = {}
+    for filter_name, columns in FilterEngine.FILTER_COLUMNS.items():
+        column = next((col for col in columns if col in df.columns), None)
+        if column is not None:
+            options[filter_name] = list(df[column].dropna().unique()) + ['Nobody']
+    options['date_range'] = [(date(2023, 3, 1), date(2023, 9, 30)), (date(2024, 2, 29), date(2024, 2, 29)),
+                             (date(2020, 1, 1), date(2021, 1, 1)), (date(2022, 6, 1), date(2026, 1, 1))]
+
+    filters = [{}, {'branch': None, 'category': None}]
+    for filter_name, values in options.items():
+        filters += [{filter_name: value} for value in values]
+    for names in itertools.combinations(options, 2):
+        filters += [dict(zip(names, values)) for values in itertools.product(*(options[name][:3] for name in names))]
+    for names in itertools.combinations(options, 3):
+        filters.append({name: options[name][1] for name in names})
+    return filters
+
+
+@pytest.mark.parametrize('table_name', TABLES)
+def test_row_indexer_matches_masks(sample_loader, table_name):
+    engine = FilterEngine(sample_loader)
+    df = sample_loader.get_data(table_name)
+    for filters in sample_filters(df):
+        positions = engine.row_indexer(table_name, filters)
+        if positions is None:
+            positions = np.arange(len(df))
+        np.testing.assert_array_equal(positions, mask_filter(df, filters), err_msg=str(filters))
+
+
+def test_dimensions_limit_the_filters(sample_loader):
+    engine = FilterEngine(sample_loader)
+    df = sample_loader.get_data('completed_services')
+    filters = {'branch': 'North', 'technician': 'Tech 1'}
+    positions = engine.row_indexer('completed_services', filters, ['branch'])
+    np.testing.assert_array_equal(positions, mask_filter(df, {'branch': 'North'}))
+
+
+def test_filter_returns_the_shared_frame_when_unfiltered(sample_loader):
+    engine = FilterEngine(sample_loader)
+    df = sample_loader.get_data('sales_by_tech')
+    assert engine.filter('sales_by_tech', {}) is df
+    assert engine.filter('sales_by_tech', {'branch': 'North'}) is df
+
+
+def test_within_narrows_the_date_range():
+    filters = FilterEngine.within({'branch': 'North', 'date_range': (date(2024, 3, 1), date(2025, 6, 30))},
+                                  date(2024, 1, 1), date(2024, 12, 31))
+    assert filters == {'branch': 'North', 'date_range': (date(2024, 3, 1), date(2024, 12, 31))}
+    assert FilterEngine.within(None, date(2024, 1, 1), date(2024, 12, 31)) == {'date_range': (date(2024, 1, 1), date(2024, 12, 31))}
@@ -0,0 +1,60 @@
+"""
+KPI Cube Tests
+The monthly_means kernel against the two-level pandas groupby it replaces
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.kpi_cube import monthly_means
+
+
+def groupby_monthly_means(entities, months, values):
+    """Monthly sums per entity, then their mean per entity"""
+    df = pd.DataFrame({'entity': entities, 'month': months, 'value': values})
+    monthly = df.groupby(['entity', 'month'], observed=True)['value'].sum()
+    return monthly.groupby(level='entity', observed=True).mean()
+
+
+def kernel_monthly_means(entities, months, values):
+    """monthly_means over factorized codes, as a Series like the groupby's"""
+    entity_codes, names = pd.factorize(entities, sort=True)
+    month_codes, month_names = pd.factorize(months)
+    means = monthly_means(entity_codes, month_codes, values, len(names), len(month_names))
+    observed = ~np.isnan(means)
+    return pd.Series(means[observed], index=pd.Index(names[observed], name='entity'), name='value')
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_groupby(seed):
+    rng = np.random.default_rng(seed)
+    rows = 5000
+    entities = pd.Series(rng.choice([f"Tech {i}" for i in range(40)], rows))
+    months = pd.Series(rng.choice(pd.period_range('2022-01', periods=30, freq='M'), rows))
+    values = rng.uniform(-100, 1000, rows)
+    # Missing values add nothing to a month; missing entities and months drop the row
+    values[rng.random(rows) < 0.05] = np.nan
+    entities[rng.random(rows) < 0.02] = None
+    months[rng.random(rows) < 0.02] = None
+
+    expected = groupby_monthly_means(entities, months, values)
+    result = kernel_monthly_means(entities, months, values)
+    pd.testing.assert_series_equal(result, expected, check_names=False, check_index_type=False, rtol=1e-9)
+
+
+def test_entity_without_months_is_nan():
+    means = monthly_means(np.array([0, 0, 1]), np.array([0, 1, -1]), np.array([3.0, 5.0, 7.0]), 3, 2)
+    assert means[0] == 4.0
+    assert np.isnan(means[1]) and np.isnan(means[2])
+
+
+def test_month_of_missing_values_still_counts():
+    # groupby sums an all-NaN month to 0, which lowers the mean
+    means = monthly_means(np.array([0, 0]), np.array([0, 1]), np.array([6.0, np.nan]), 1, 2)
+    assert means[0] == 3.0
+
+
+def test_empty_input():
+    means = monthly_means(np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([]), 2, 0)
+    assert means.shape == (2,) and np.isnan(means).all()
@@ -0,0 +1,52 @@
+"""
+Refresh Tests
+Incremental refresh of the append-only tables, read whole or streamed in small chunks
+"""
+
+import pandas as pd
+import pytest
+
+from conftest import write_sample_workbook
+from src.data_loader import DataLoader
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_appended_rows_refresh_incrementally(tmp_path, streaming):
+    path = tmp_path / 'workbook.xlsx'
+    write_sample_workbook(path, 60)
+    loader = DataLoader(str(path), use_cache=False, streaming=streaming, chunk_size=7)
+    loader.prefetch(list(DataLoader.APPEND_ONLY_TABLES))
+
+    write_sample_workbook(path, 75)
+    refreshed = loader.refresh()
+    fresh = DataLoader(str(path), use_cache=False)
+    for table_name in DataLoader.APPEND_ONLY_TABLES:
+        assert table_name in refreshed.appended_rows
+        assert refreshed.appended_rows[table_name].index.min() >= 60
+        pd.testing.assert_frame_equal(refreshed.get_data(table_name).reset_index(drop=True),
+                                      fresh.get_data(table_name).reset_index(drop=True), check_categorical=False)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_edited_row_reloads_in_full(tmp_path, streaming):
+    path = tmp_path / 'workbook.xlsx'
+    write_sample_workbook(path, 60)
+    loader = DataLoader(str(path), use_cache=False, streaming=streaming, chunk_size=7)
+    loader.prefetch(list(DataLoader.APPEND_ONLY_TABLES))
+
+    write_sample_workbook(path, 75, edit=20)
+    refreshed = loader.refresh()
+    assert refreshed.appended_rows == {}
+    names = refreshed.get_data('sales_by_tech')['Customer Name']
+    assert (names == 'Edited').sum() == 1
+
+
+def test_streamed_hashes_match_whole_sheet(tmp_path):
+    path = tmp_path / 'workbook.xlsx'
+    write_sample_workbook(path, 60)
+    whole = DataLoader(str(path), use_cache=False)
+    streamed = DataLoader(str(path), use_cache=False, streaming=True, chunk_size=7)
+    for table_name in DataLoader.APPEND_ONLY_TABLES:
+        whole.get_data(table_name)
+        streamed.get_data(table_name)
+        assert (whole.row_hashes[table_name] == streamed.row_hashes[table_name]).all()
@@ -0,0 +1,64 @@
+"""
+Search Index Tests
+SearchIndex.search against scanning every row's words
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from src.search_index import SearchIndex
+
+TABLES = ['completed_services', 'sales_by_tech']
+
+
+def row_words(df, columns):
+    """Set of lowercase words in each row's columns"""
+    cells = [[re.findall(r'\w+', str(value).lower()) if value == value and value is not None else [] for value in df[column]]
+             for column in columns]
+    return [set().union(*row) for row in zip(*cells)] if cells else [set()] * len(df)
+
+
+def scan(words_by_row, query, prefix=True):
+    """Rows where every word of the query starts (or equals) one of the row's words"""
+    terms = set(re.findall(r'\w+', query.lower()))
+    if not terms:
+        return None
+    rows = [i for i, words in enumerate(words_by_row)
+            if all(any(word.startswith(term) if prefix else word == term for word in words) for term in terms)]
+    return np.array(rows, dtype=np.intp)
+
+
+def sample_queries(df, columns):
+    """Whole words, prefixes, several words, punctuation and words nowhere in the table"""
+    words = sorted({word for column in columns for value in df[column].dropna().unique()
+                    for word in re.findall(r'\w+', str(value).lower())})
+    queries = ['', '  ', '&', 'zzzq', 'customer zzzq']
+    for word in words[::max(1, len(words) // 15)]:
+        queries += [word, word[:1], word[:3], word.upper()]
+    queries += [f"{a} {b}" for a, b in zip(words[::7], words[3::7])]
+    return queries + ['call-back', 'lawn & weed', 'customer 12', 'tech 1 monthly']
+
+
+@pytest.mark.parametrize('table_name', TABLES)
+@pytest.mark.parametrize('prefix', [True, False])
+def test_search_matches_scan(sample_loader, table_name, prefix):
+    index = SearchIndex(sample_loader)
+    df = sample_loader.get_data(table_name)
+    columns = list(df.select_dtypes(include=['object', 'category']).columns)
+    words_by_row = row_words(df, columns)
+    for query in sample_queries(df, columns):
+        expected = scan(words_by_row, query, prefix)
+        result = index.search(table_name, query, columns, prefix)
+        if expected is None:
+            assert result is None, query
+        else:
+            np.testing.assert_array_equal(result, expected, err_msg=query)
+
+
+def test_search_one_column(sample_loader):
+    index = SearchIndex(sample_loader)
+    words_by_row = row_words(sample_loader.get_data('completed_services'), ['Name'])
+    for query in ['termite', 'pest', 'call back', 'North']:
+        np.testing.assert_array_equal(index.search('completed_services', query, ['Name']), scan(words_by_row, query))